@@ -1,39 +1,61 @@
-import json
+import os
 import glob
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+
+# Compiled once per process; audit_file runs these against every string in the file
+CMD_RE = re.compile(r'\\[a-zA-Z]+')
+# "frac{" without a backslash, or any escape other than \n \t \" \' \\, in one pass
+COMBINED_RE = re.compile(r'(?P<frac>(?<!\\)frac\{)|(?P<cmd>\\[^nt"\'\\])')
 
 def audit_file(filepath):
-    print(f"\n--- Auditing {filepath} ---")
+    """Audit one JSON file and return its report lines (printed by the caller)."""
+    findings = [f"\n--- Auditing {filepath} ---"]
     try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        with open(filepath, 'rb') as f:
+            data = orjson.loads(f.read())
             
-        # Recursive search for strings
-        def check_latex(obj, path=""):
+        # Iterative walk over all strings (no recursion, so deep/large files are fine).
+        # Children are pushed in reverse so findings come out in document order.
+        stack = [(data, "")]
+        while stack:
+            obj, path = stack.pop()
             if isinstance(obj, str):
-                # Check for suspicious patterns
+                # Check for suspicious patterns:
                 # 1. "frac" without backslash
-                if re.search(r'(?<!\\)frac\{', obj):
-                    print(f"[POTENTIAL ERROR] Found 'frac{{' without backslash at {path}: {obj[:50]}...")
-                # 2. LaTeX-like chars without delimiters
-                if re.search(r'\\[a-zA-Z]+', obj) and not ('$' in obj):
-                    # It might be normal text with newline \n, so be careful.
-                    # ignore \n, \t, \", \'
-                    if re.search(r'\\[^nt"\'\\]', obj):
-                         print(f"[WARNING] Found LaTeX-like command without $ delimiters at {path}: {obj}")
+                # 2. LaTeX-like command without $ delimiters. It might be normal
+                #    text with newline \n, so ignore \n, \t, \", \'
+                check_cmd = '$' not in obj
+                has_frac = has_cmd = False
+                for m in COMBINED_RE.finditer(obj):
+                    if m.lastgroup == "frac":
+                        has_frac = True
+                    elif check_cmd and not has_cmd:
+                        # A non-letter escape (e.g. "\(") still needs a real \command somewhere
+                        has_cmd = m.group()[1].isalpha() or bool(CMD_RE.search(obj))
+                        check_cmd = has_cmd
+                    if has_frac and (has_cmd or not check_cmd):
+                        break
+                if has_frac:
+                    findings.append(f"[POTENTIAL ERROR] Found 'frac{{' without backslash at {path}: {obj[:50]}...")
+                if has_cmd:
+                    findings.append(f"[WARNING] Found LaTeX-like command without $ delimiters at {path}: {obj}")
                 # 3. Double-escaped backslashes count
                 # We expect '\\frac' in the file string means '\frac' in memory.
             elif isinstance(obj, dict):
-                for k, v in obj.items():
-                    check_latex(v, f"{path}.{k}")
+                stack.extend((v, f"{path}.{k}") for k, v in reversed(obj.items()))
             elif isinstance(obj, list):
-                for i, v in enumerate(obj):
-                    check_latex(v, f"{path}[{i}]")
-                    
-        check_latex(data)
+                stack.extend((obj[i], f"{path}[{i}]") for i in range(len(obj) - 1, -1, -1))
     except Exception as e:
-        print(f"Failed to read {filepath}: {e}")
+        findings.append(f"Failed to read {filepath}: {e}")
+    return findings
 
-files = glob.glob("output/*.json")
-for f in files:
-    audit_file(f)
+if __name__ == "__main__":
+    files = glob.glob("output/*.json")
+    # Files are independent, so audit them on separate cores and print
+    # each report whole (in file order) from the parent
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for findings in ex.map(audit_file, files, chunksize=4):
+            print("\n".join(findings))
@@ -0,0 +1,64 @@
+"""
+Shared scratch resources for the extraction/ingest hot paths.
+
+- Byte buffers: reusable 64 KB bytearrays for streaming copies (readinto
+  instead of a fresh bytes object per chunk)
+- Work paths: unique file paths under one per-process scratch directory,
+  so callers don't create and tear down a temp directory per file
+"""
+
+import os
+import queue
+import tempfile
+import uuid
+from typing import BinaryIO, Iterator
+
+BUF_SIZE = 64 * 1024
+# Idle buffers kept around; extra ones returned beyond this are dropped
+MAX_POOLED_BUFS = 32
+
+_byte_pool: "queue.LifoQueue[bytearray]" = queue.LifoQueue(maxsize=MAX_POOLED_BUFS)
+
+_work_dir = None
+
+
+def get_buf() -> bytearray:
+    """A BUF_SIZE bytearray from the pool (or a new one if the pool is empty)."""
+    try:
+        return _byte_pool.get_nowait()
+    except queue.Empty:
+        return bytearray(BUF_SIZE)
+
+
+def put_buf(buf: bytearray) -> None:
+    """Return a buffer from get_buf() to the pool."""
+    try:
+        _byte_pool.put_nowait(buf)
+    except queue.Full:
+        pass
+
+
+def iter_chunks(src: BinaryIO) -> Iterator[memoryview]:
+    """
+    Yield successive chunks of src read into one pooled buffer.
+    
+    Each chunk is a view that is overwritten by the next read, so the
+    consumer must use it before asking for the next one (true of
+    requests/urllib3 request bodies and file writes).
+    """
+    buf = get_buf()
+    view = memoryview(buf)
+    try:
+        while n := src.readinto(buf):
+            yield view[:n]
+    finally:
+        view.release()
+        put_buf(buf)
+
+
+def work_path(suffix: str = "") -> str:
+    """A unique, not-yet-existing path in this process's scratch directory. Caller removes it."""
+    global _work_dir
+    if _work_dir is None:
+        _work_dir = tempfile.TemporaryDirectory(prefix="beeprepared-work-")
+    return os.path.join(_work_dir.name, f"{uuid.uuid4().hex}{suffix}")
@@ -4,7 +4,7 @@ Converts all supported file formats to raw text for processing.
 
 Supported Formats:
 - PDF: PyMuPDF (fitz) extraction
-- PPTX: python-pptx extraction
+- PPTX: direct zip + lxml slide parsing
 - MD/TXT: Direct read
 - Audio (WAV/MP3): Azure Speech transcription
 - Video (MP4/etc): FFmpeg audio extraction → Azure Speech
@@ -15,22 +15,47 @@ import logging
 import tempfile
 import time
 import shutil
+import io
+import asyncio
+import json
+import mmap
+import hashlib
+import threading
+import zipfile
+import posixpath
+import multiprocessing
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Iterable, List, Optional, Tuple
+from cachetools import LRUCache
 from dotenv import load_dotenv
 
 import boto3
+import requests
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 # import azure.cognitiveservices.speech as speechsdk
 import pypdf
 try:
-    from pptx import Presentation
+    import fitz  # PyMuPDF: much faster than pypdf; pypdf remains the fallback
 except ImportError:
-    Presentation = None
+    fitz = None
 try:
     from docx import Document
 except ImportError:
     Document = None
 import ffmpeg
+from lxml import etree
+try:
+    from websockets.sync.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+from backend.core._pools import iter_chunks
 
 
 # Configure logging
@@ -39,6 +64,179 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Documents up to this size are parsed straight from the R2 response body,
+# without a temp file
+IN_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+IN_MEMORY_EXTS = {'.pdf', '.pptx', '.md', '.txt', '.docx'}
+
+# Large audio/video downloads fetch 8 MB parts in parallel
+R2_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+)
+
+# Transcripts keyed by the SHA-256 of the media file, so retries and
+# re-ingests of the same recording skip Deepgram entirely
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "beeprepared-transcripts")
+TRANSCRIPT_CACHE_TTL_SECONDS = 30 * 86400
+TRANSCRIPT_CACHE_DISABLED = os.getenv("TRANSCRIPT_CACHE_DISABLED", "").lower() in {"1", "true", "yes"}
+
+# Audio streamed to Deepgram is Opus/Ogg (10-20x smaller upload than PCM);
+# KEEP_WAV=1 sends raw 16 kHz PCM instead
+KEEP_WAV = os.getenv("KEEP_WAV", "").lower() in {"1", "true", "yes"}
+
+DEEPGRAM_LISTEN_PARAMS = "model=nova-2&smart_format=true&punctuate=true&language=en"
+DEEPGRAM_PCM_PARAMS = "&encoding=linear16&sample_rate=16000&channels=1"
+# Opt-in: transcribe video over the live websocket so results stream back
+# while audio is still uploading (REST remains the fallback)
+DEEPGRAM_LIVE = os.getenv("DEEPGRAM_LIVE", "").lower() in {"1", "true", "yes"}
+
+# Results of extract() for unchanged files, keyed by (path, mtime_ns, size)
+# and bounded by total extracted characters (~16M chars is 16-64 MB of str);
+# EXTRACT_CACHE_SIZE=0 disables it
+EXTRACT_CACHE_SIZE = int(os.getenv("EXTRACT_CACHE_SIZE", str(16_000_000)))
+
+# Text files above this size are decoded straight from an mmap instead of
+# being read into an intermediate bytes object first
+MMAP_MIN_BYTES = 4 * 1024 * 1024
+
+# PresentationML / DrawingML namespaces for the PPTX parser
+PPTX_NS = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+_NOTES_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide'
+
+
+def _pptx_rels(z: zipfile.ZipFile, part: str) -> dict:
+    """Relationship id -> (type, target part name) for a part in the package."""
+    rels_name = posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+    if rels_name not in z.namelist():
+        return {}
+    base = posixpath.dirname(part)
+    return {
+        rel.get("Id"): (rel.get("Type"), posixpath.normpath(posixpath.join(base, rel.get("Target"))))
+        for rel in etree.fromstring(z.read(rels_name)).iterfind("rel:Relationship", PPTX_NS)
+    }
+
+
+def _pptx_text_body(el) -> str:
+    """Text of a txBody: runs joined per paragraph (a:br as a vertical tab), paragraphs joined by newlines."""
+    return "\n".join(
+        "".join("\v" if etree.QName(c).localname == "br" else "".join(c.xpath("a:t/text()", namespaces=PPTX_NS))
+                for c in p)
+        for p in el.iterfind("a:p", PPTX_NS)
+    )
+
+
+# PDFs with at least this many pages are split across worker processes
+# (PyMuPDF is not thread-safe and pypdf is pure Python, so threads won't help)
+PDF_PARALLEL_MIN_PAGES = 32
+
+# Plain-text extraction flags: keep whitespace and clip to the page, but
+# leave out ligature preservation (TEXTFLAGS_TEXT default) we don't need
+PDF_TEXT_FLAGS = (fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP) if fitz else 0
+
+
+def _open_pdf(source):
+    """Open a PDF (path or bytes) with PyMuPDF."""
+    return fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+
+
+def _pdf_page_count(source) -> int:
+    if fitz is not None:
+        with _open_pdf(source) as doc:
+            return doc.page_count
+    return len(pypdf.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source).pages)
+
+
+def _pdf_page_texts(source, start: int, end: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    Extract pages [start, end) of a PDF (path or bytes) as (page_num, text)
+    pairs; end=None means to the last page.
+    """
+    if fitz is not None:
+        with _open_pdf(source) as doc:
+            end = doc.page_count if end is None else end
+            return [(i + 1, doc[i].get_text("text", flags=PDF_TEXT_FLAGS, sort=False)) for i in range(start, end)]
+    
+    reader = pypdf.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    end = len(reader.pages) if end is None else end
+    return [(i + 1, reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def _pdf_page_range(args: Tuple[str, int, int]) -> List[Tuple[int, str]]:
+    """
+    Worker: extract pages [start, end) of a PDF. Returns (page_num, text) pairs.
+    
+    Module-level so it can be pickled into a pool; each worker opens its own document.
+    """
+    file_path, start, end = args
+    return _pdf_page_texts(file_path, start, end)
+
+
+# One spawn-context process pool shared by every PDF extraction, created on
+# first use and shut down at exit. Starting a fresh 4-worker spawn pool costs
+# ~280 ms per call before the workers even import this module; reusing a warm
+# one costs <1 ms. spawn, not fork: this runs inside a threaded server process.
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_executor
+
+
+def _reset_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken executor so the next call starts a fresh one."""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    with _pdf_executor_lock:
+        executor, _pdf_executor = _pdf_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Direct runs only (plain and hyperlinked), as python-docx's Paragraph.text
+# reads them; runs nested in text boxes (w:txbxContent) are not included
+_DOCX_RUN_CONTENT = (
+    "./w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]"
+    " | ./w:hyperlink/w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]"
+)
+
+
+def _docx_paragraph_text(p) -> str:
+    """Text of a w:p the way python-docx renders it (tabs and line breaks included)."""
+    parts = []
+    for el in p.xpath(_DOCX_RUN_CONTENT):
+        tag = el.tag
+        if tag == _W + "t":
+            parts.append(el.text or "")
+        elif tag == _W + "tab":
+            parts.append("\t")
+        elif tag == _W + "cr" or el.get(_W + "type", "textWrapping") == "textWrapping":
+            parts.append("\n")
+    return "".join(parts)
+
 
 class ExtractionService:
     """
@@ -49,13 +247,52 @@ class ExtractionService:
     SUPPORTED_VIDEO = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.wmv'}
     SUPPORTED_DOCS = {'.pdf', '.pptx', '.ppt', '.md', '.txt', '.docx'}
     
+    # Extension -> file type, built once from the sets above
+    EXT_TO_TYPE = {
+        **{ext: "audio" for ext in SUPPORTED_AUDIO},
+        **{ext: "video" for ext in SUPPORTED_VIDEO},
+        ".pdf": "pdf",
+        ".pptx": "pptx",
+        ".ppt": "pptx",
+        ".md": "markdown",
+        ".txt": "text",
+        ".docx": "docx",
+    }
+    
     def __init__(self):
         # self._setup_azure_speech()
         self._setup_deepgram()
         self._setup_r2()
+        
+        # File type -> extractor, bound once so extract() is a single lookup
+        self._extractors = {
+            "pdf": self._extract_pdf,
+            "pptx": self._extract_pptx,
+            "markdown": self._extract_text,
+            "text": self._extract_text,
+            "docx": self._extract_docx,
+            "audio": self._transcribe_deepgram,
+            "video": self._transcribe_video,
+        }
+        
+        # (path, mtime_ns, size) -> (text, metadata), sized by len(text);
+        # extract_many() calls in from threads
+        self._extract_cache: Optional[LRUCache] = (
+            LRUCache(maxsize=EXTRACT_CACHE_SIZE, getsizeof=lambda v: len(v[0])) if EXTRACT_CACHE_SIZE > 0 else None
+        )
+        self._extract_cache_lock = threading.Lock()
     
     def _setup_deepgram(self):
         """Initialize Deepgram SDK."""
+        # Keep-alive session for the REST calls so each transcription skips the TLS handshake
+        self.dg_session = requests.Session()
+        # (retries cover connection failures only; POSTs are never replayed after sending)
+        self.dg_session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.5),
+        ))
+        
         self.dg_key = os.getenv("DEEPGRAM_API_KEY") or os.getenv("DEEPGRAM_KEY")
         if self.dg_key:
             try:
@@ -82,7 +319,8 @@ class ExtractionService:
                     service_name='s3',
                     endpoint_url=self.r2_endpoint,
                     aws_access_key_id=self.r2_key,
-                    aws_secret_access_key=self.r2_secret
+                    aws_secret_access_key=self.r2_secret,
+                    config=Config(max_pool_connections=32)
                 )
             except Exception as e:
                 logger.error(f"Failed to initialize R2 client: {e}")
@@ -93,7 +331,10 @@ class ExtractionService:
 
     def extract_from_r2(self, r2_key: str) -> Tuple[str, dict]:
         """
-        Download file from R2 -> Temp File -> Extract -> Return.
+        Download file from R2 -> Extract -> Return.
+        
+        Documents are parsed from memory; audio/video (which ffmpeg and the
+        transcriber read from disk) go through a temp file.
         """
         if not self.s3_client:
             raise RuntimeError("R2 client not initialized. Check credentials.")
@@ -101,13 +342,22 @@ class ExtractionService:
         logger.info(f"Downloading from R2: {r2_key}")
         ext = os.path.splitext(r2_key)[1]
         
+        if ext.lower() in IN_MEMORY_EXTS:
+            obj = self.s3_client.get_object(Bucket=self.r2_bucket, Key=r2_key)
+            if obj.get("ContentLength", 0) <= IN_MEMORY_MAX_BYTES:
+                source = io.BytesIO(obj["Body"].read())
+                logger.info(f"Downloaded {len(source.getbuffer())} bytes into memory")
+                return self.extract(r2_key, source=source)
+            obj["Body"].close()
+        
         with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
             tmp_path = tmp.name
         
         try:
-            self.s3_client.download_file(self.r2_bucket, r2_key, tmp_path)
+            self.s3_client.download_file(self.r2_bucket, r2_key, tmp_path, Config=R2_TRANSFER_CONFIG)
             logger.info(f"Downloaded to temp file: {tmp_path}")
-            return self.extract(tmp_path)
+            # A one-off temp path can never be hit again, so don't cache it
+            return self.extract(tmp_path, cache=False)
             
         finally:
             if os.path.exists(tmp_path):
@@ -115,51 +365,44 @@ class ExtractionService:
     
     def detect_file_type(self, file_path: str) -> str:
         """Detect the type of file based on extension."""
-        ext = Path(file_path).suffix.lower()
-        
-        if ext in self.SUPPORTED_AUDIO:
-            return "audio"
-        elif ext in self.SUPPORTED_VIDEO:
-            return "video"
-        elif ext == ".pdf":
-            return "pdf"
-        elif ext in {".pptx", ".ppt"}:
-            return "pptx"
-        elif ext == ".md":
-            return "markdown"
-        elif ext == ".txt":
-            return "text"
-        elif ext == ".docx":
-            return "docx"
-        else:
-            return "unknown"
+        return self.EXT_TO_TYPE.get(os.path.splitext(file_path)[1].lower(), "unknown")
     
-    def extract(self, file_path: str) -> Tuple[str, dict]:
+    def extract(self, file_path: str, source: Optional[io.BytesIO] = None, cache: bool = True) -> Tuple[str, dict]:
         """
         Main extraction method. Routes to appropriate handler.
         
+        If source is given (documents only), the content is read from it and
+        file_path is used just for the type and name.
+        
+        Files on disk are cached by (path, mtime, size), so re-extracting an
+        unchanged file costs a stat() and a dict lookup. Pass cache=False for
+        throwaway paths (temp files) that will never be extracted again.
+        
         Returns:
              Tuple[str, dict]: (extracted_text, metadata)
         """
+        cache_key = None
+        if cache and source is None and self._extract_cache is not None:
+            st = os.stat(file_path)
+            cache_key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+            with self._extract_cache_lock:
+                hit = self._extract_cache.get(cache_key)
+            if hit is not None:
+                logger.info(f"Extraction cache hit: {file_path}")
+                return hit[0], dict(hit[1])
+        
         file_type = self.detect_file_type(file_path)
         logger.info(f"Extracting from {file_path} (type: {file_type})")
         
-        extractors = {
-            "pdf": self._extract_pdf,
-            "pptx": self._extract_pptx,
-            "markdown": self._extract_text,
-            "text": self._extract_text,
-            "docx": self._extract_docx,
-            "audio": self._transcribe_deepgram,
-            "video": self._transcribe_video,
-        }
-        
-        extractor = extractors.get(file_type)
+        extractor = self._extractors.get(file_type)
         if not extractor:
             raise ValueError(f"Unsupported file type: {file_type}")
         
+        if source is not None and file_type in {"audio", "video"}:
+            raise ValueError(f"In-memory extraction not supported for {file_type}")
+        
         start_time = time.time()
-        text, metadata = extractor(file_path)
+        text, metadata = extractor(file_path, source) if source is not None else extractor(file_path)
         elapsed = time.time() - start_time
         
         metadata["file_type"] = file_type
@@ -168,81 +411,173 @@ class ExtractionService:
         metadata["word_count"] = len(text.split())
         
         logger.info(f"Extraction complete: {metadata['word_count']} words in {elapsed:.2f}s")
+        # Texts bigger than the whole cache aren't kept (LRUCache would raise)
+        if cache_key is not None and len(text) <= self._extract_cache.maxsize:
+            with self._extract_cache_lock:
+                self._extract_cache[cache_key] = (text, dict(metadata))
         return text, metadata
     
+    async def extract_many(self, paths: Iterable[str], max_concurrency: int = 8) -> List[Tuple[str, dict]]:
+        """
+        Extract several files concurrently, at most max_concurrency at a time.
+        
+        Each file runs extract() in a worker thread; results are in input
+        order. Transcriptions (network-bound) overlap fully; large PDFs
+        already fan out to worker processes inside _extract_pdf.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+        loop = asyncio.get_running_loop()
+        
+        async def one(path: str) -> Tuple[str, dict]:
+            async with sem:
+                return await loop.run_in_executor(None, self.extract, path)
+        
+        return await asyncio.gather(*(one(p) for p in paths))
+    
     # =========================================================================
     # DOCUMENT EXTRACTORS
     # =========================================================================
     
-    def _extract_pdf(self, file_path: str) -> Tuple[str, dict]:
-        """Extract text from PDF using pypdf."""
+    def _extract_pdf(self, file_path: str, source: Optional[io.BytesIO] = None) -> Tuple[str, dict]:
+        """Extract text from PDF using PyMuPDF (pypdf if PyMuPDF is unavailable)."""
         logger.info(f"Extracting PDF: {file_path}")
         
-        text_parts = []
+        # Pages are written into one growing buffer rather than a list joined at the end
+        buf = io.StringIO()
+        write = buf.write
+        page_total = 0
         try:
-            reader = pypdf.PdfReader(file_path)
-            for i, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text()
+            pdf = source.getvalue() if source is not None else file_path
+            page_count = _pdf_page_count(pdf)
+            workers = min(os.cpu_count() or 1, page_count // (PDF_PARALLEL_MIN_PAGES // 2) or 1)
+            
+            if page_count < PDF_PARALLEL_MIN_PAGES or workers < 2:
+                pages = _pdf_page_texts(pdf, 0)
+            elif source is not None:
+                # Workers open the file themselves, so spill to disk first
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                    tmp.write(source.getbuffer())
+                try:
+                    full_text, metadata = self._extract_pdf(tmp.name)
+                finally:
+                    os.remove(tmp.name)
+                metadata["source"] = Path(file_path).name
+                return full_text, metadata
+            else:
+                # Contiguous page ranges, one per worker; results come back in order
+                step = -(-page_count // workers)
+                segments = [(file_path, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+                executor = _get_pdf_executor()
+                try:
+                    pages = [page for chunk in executor.map(_pdf_page_range, segments) for page in chunk]
+                except BrokenProcessPool:
+                    _reset_pdf_executor(executor)
+                    raise
+            
+            for i, page_text in pages:
                 if page_text and page_text.strip():
-                    text_parts.append(f"--- Page {i} ---\n{page_text}")
+                    if page_total:
+                        write("\n\n")
+                    write("--- Page ")
+                    write(str(i))
+                    write(" ---\n")
+                    write(page_text)
+                    page_total += 1
         except Exception as e:
             logger.error(f"PDF extraction failed: {e}")
             raise
             
-        full_text = "\n\n".join(text_parts)
+        full_text = buf.getvalue()
         metadata = {
-            "page_count": len(text_parts),
+            "page_count": page_total,
             "source": Path(file_path).name
         }
         
         return full_text, metadata
 
     
-    def _extract_pptx(self, file_path: str) -> Tuple[str, dict]:
-        """Extract text from PowerPoint presentations."""
-        logger.info(f"Extracting PPTX: {file_path}")
+    def _extract_pptx(self, file_path: str, source: Optional[io.BytesIO] = None) -> Tuple[str, dict]:
+        """
+        Extract text from PowerPoint presentations.
         
-        prs = Presentation(file_path)
-        text_parts = []
+        Reads the slide XML straight out of the zip with lxml instead of
+        building python-pptx Shape/Table/Cell objects. Covers the same content:
+        top-level shape text, table rows, and speaker notes, in slide order.
+        """
+        logger.info(f"Extracting PPTX: {file_path}")
         
-        for slide_num, slide in enumerate(prs.slides, 1):
-            slide_text = []
+        buf = io.StringIO()
+        write = buf.write
+        with zipfile.ZipFile(source if source is not None else file_path) as z:
+            presentation = "ppt/presentation.xml"
+            pres_rels = _pptx_rels(z, presentation)
+            slide_ids = etree.fromstring(z.read(presentation)).xpath("p:sldIdLst/p:sldId/@r:id", namespaces=PPTX_NS)
+            slides = [pres_rels[rid][1] for rid in slide_ids]
             
-            # Extract from shapes
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    slide_text.append(shape.text.strip())
+            for slide_num, slide_part in enumerate(slides, 1):
+                slide_text = []
+                append = slide_text.append
+                slide = etree.fromstring(z.read(slide_part))
                 
-                # Extract from tables
-                if shape.has_table:
-                    for row in shape.table.rows:
-                        row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                        if row_text:
-                            slide_text.append(" | ".join(row_text))
-            
-            # Extract speaker notes
-            if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-                notes = slide.notes_slide.notes_text_frame.text.strip()
-                if notes:
-                    slide_text.append(f"[Speaker Notes: {notes}]")
-            
-            if slide_text:
-                text_parts.append(f"--- Slide {slide_num} ---\n" + "\n".join(slide_text))
-        
-        full_text = "\n\n".join(text_parts)
+                # Top-level shapes only (group contents are skipped, as before)
+                for shape in slide.iterfind("p:cSld/p:spTree/*", PPTX_NS):
+                    tag = etree.QName(shape).localname
+                    if tag == "sp":
+                        body = shape.find("p:txBody", PPTX_NS)
+                        text = _pptx_text_body(body).strip() if body is not None else ""
+                        if text:
+                            append(text)
+                    elif tag == "graphicFrame":
+                        # Extract from tables
+                        for row in shape.iterfind(".//a:tbl/a:tr", PPTX_NS):
+                            row_text = [
+                                t for t in (_pptx_text_body(tc.find("a:txBody", PPTX_NS)).strip()
+                                            for tc in row.iterfind("a:tc", PPTX_NS)
+                                            if tc.find("a:txBody", PPTX_NS) is not None)
+                                if t
+                            ]
+                            if row_text:
+                                append(" | ".join(row_text))
+                
+                # Extract speaker notes (the notes slide's body placeholder)
+                notes_part = next((t for typ, t in _pptx_rels(z, slide_part).values() if typ == _NOTES_REL), None)
+                if notes_part is not None and notes_part in z.namelist():
+                    notes_slide = etree.fromstring(z.read(notes_part))
+                    bodies = notes_slide.xpath(
+                        "p:cSld/p:spTree/p:sp[p:nvSpPr/p:nvPr/p:ph[@type='body']]/p:txBody", namespaces=PPTX_NS
+                    )
+                    notes = _pptx_text_body(bodies[0]).strip() if bodies else ""
+                    if notes:
+                        append(f"[Speaker Notes: {notes}]")
+                
+                if slide_text:
+                    if buf.tell():
+                        write("\n\n")
+                    write("--- Slide ")
+                    write(str(slide_num))
+                    write(" ---\n")
+                    write("\n".join(slide_text))
+        
+        full_text = buf.getvalue()
         metadata = {
-            "slide_count": len(prs.slides),
+            "slide_count": len(slides),
             "source": Path(file_path).name
         }
         
         return full_text, metadata
     
-    def _extract_text(self, file_path: str) -> Tuple[str, dict]:
+    def _extract_text(self, file_path: str, source: Optional[io.BytesIO] = None) -> Tuple[str, dict]:
         """Extract text from plain text or markdown files."""
         logger.info(f"Reading text file: {file_path}")
         
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            text = f.read()
+        if source is not None:
+            text = str(source.getbuffer(), "utf-8", "ignore")
+        elif os.path.getsize(file_path) >= MMAP_MIN_BYTES:
+            with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8", "ignore")
+        else:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
         
         metadata = {
             "source": Path(file_path).name
@@ -250,27 +585,47 @@ class ExtractionService:
         
         return text, metadata
     
-    def _extract_docx(self, file_path: str) -> Tuple[str, dict]:
-        """Extract text from Word documents."""
-        logger.info(f"Extracting DOCX: {file_path}")
-        
-        doc = Document(file_path)
-        text_parts = []
-        
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text)
+    def _extract_docx(self, file_path: str, source: Optional[io.BytesIO] = None) -> Tuple[str, dict]:
+        """
+        Extract text from Word documents.
         
-        # Extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                if row_text:
-                    text_parts.append(" | ".join(row_text))
+        Reads run text straight from the body XML with XPath rather than
+        through doc.paragraphs/doc.tables, which wrap every node in a Python
+        object and crawl on large documents.
+        """
+        logger.info(f"Extracting DOCX: {file_path}")
         
-        full_text = "\n\n".join(text_parts)
+        doc = Document(source if source is not None else file_path)
+        # python-docx elements resolve the w: prefix in xpath() themselves
+        body = doc.element.body
+        buf = io.StringIO()
+        write = buf.write
+        
+        def emit(text: str) -> None:
+            if buf.tell():
+                write("\n\n")
+            write(text)
+        
+        # Top-level paragraphs (table paragraphs are handled below)
+        paragraphs = body.xpath("./w:p")
+        for p in paragraphs:
+            text = _docx_paragraph_text(p)
+            if text.strip():
+                emit(text)
+        
+        # Extract from tables: one line per row, cells joined with " | "
+        for row in body.xpath("./w:tbl/w:tr"):
+            row_text = []
+            for cell in row.xpath("./w:tc"):
+                cell_text = "\n".join(_docx_paragraph_text(p) for p in cell.xpath("./w:p")).strip()
+                if cell_text:
+                    row_text.append(cell_text)
+            if row_text:
+                emit(" | ".join(row_text))
+        
+        full_text = buf.getvalue()
         metadata = {
-            "paragraph_count": len(doc.paragraphs),
+            "paragraph_count": len(paragraphs),
             "source": Path(file_path).name
         }
         
@@ -318,43 +673,82 @@ class ExtractionService:
             if ext != ".wav" and os.path.exists(wav_path):
                 os.remove(wav_path)
     
-    def _transcribe_deepgram(self, file_path: str) -> Tuple[str, dict]:
-        """
-        Transcribe audio using Deepgram Nova-2 (Direct REST API).
-        Bypasses SDK version issues.
-        """
+    def _require_deepgram_key(self) -> None:
         if not self.dg_key:
             self.dg_key = os.getenv("DEEPGRAM_API_KEY") or os.getenv("DEEPGRAM_KEY")
             
         if not self.dg_key:
             raise RuntimeError("Deepgram API Key not found.")
+    
+    def _post_to_deepgram(self, body, content_type: str, extra_params: str = "") -> str:
+        """POST an audio body (file object or byte iterator) to Deepgram and return the transcript."""
+        url = f"https://api.deepgram.com/v1/listen?{DEEPGRAM_LISTEN_PARAMS}{extra_params}"
+        headers = {
+            "Authorization": f"Token {self.dg_key}",
+            "Content-Type": content_type
+        }
+        
+        response = self.dg_session.post(url, headers=headers, data=body)
+        response.raise_for_status()
+        
+        result = response.json()
+        # Parse result
+        return result['results']['channels'][0]['alternatives'][0]['transcript']
+    
+    def _cached_transcription(self, file_path: str, transcribe: Callable[[str], Tuple[str, dict]]) -> Tuple[str, dict]:
+        """Return the cached (transcript, metadata) for this file's bytes, or transcribe and store it."""
+        if TRANSCRIPT_CACHE_DISABLED:
+            return transcribe(file_path)
+        
+        with open(file_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        cache_path = os.path.join(TRANSCRIPT_CACHE_DIR, f"nova-2-{digest}.json")
+        
+        try:
+            if time.time() - os.path.getmtime(cache_path) < TRANSCRIPT_CACHE_TTL_SECONDS:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    transcript, metadata = json.load(f)
+                logger.info(f"Transcript cache hit for {Path(file_path).name}")
+                metadata["source"] = Path(file_path).name
+                return transcript, metadata
+        except (OSError, ValueError):
+            pass
+        
+        transcript, metadata = transcribe(file_path)
+        
+        try:
+            os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=TRANSCRIPT_CACHE_DIR, delete=False) as tmp:
+                json.dump([transcript, metadata], tmp)
+            os.replace(tmp.name, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache transcript: {e}")
+        
+        return transcript, metadata
+    
+    def _transcribe_deepgram(self, file_path: str) -> Tuple[str, dict]:
+        """
+        Transcribe audio using Deepgram Nova-2 (Direct REST API).
+        Bypasses SDK version issues.
+        """
+        return self._cached_transcription(file_path, self._transcribe_deepgram_uncached)
+    
+    def _transcribe_deepgram_uncached(self, file_path: str) -> Tuple[str, dict]:
+        self._require_deepgram_key()
 
         logger.info(f"Transcribing with Deepgram Nova-2 (REST): {file_path}")
         
         try:
-            import requests
-            
-            with open(file_path, "rb") as audio:
-                data = audio.read()
-            
             # Determine content type (optional, but good practice)
             ext = Path(file_path).suffix.lower()
             content_type = "audio/wav"
             if ext == ".mp3": content_type = "audio/mpeg"
             elif ext == ".m4a": content_type = "audio/mp4" # approx
+            elif ext in {".ogg", ".opus"}: content_type = "audio/ogg"
             
-            url = "https://api.deepgram.com/v1/listen?model=nova-2&smart_format=true&punctuate=true&language=en"
-            headers = {
-                "Authorization": f"Token {self.dg_key}",
-                "Content-Type": content_type
-            }
-            
-            response = requests.post(url, headers=headers, data=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            # Parse result
-            transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
+            # Stream the file as the request body instead of reading it into memory
+            with open(file_path, "rb") as audio:
+                transcript = self._post_to_deepgram(audio, content_type)
             
             logger.info(f"Deepgram transcription complete. Length: {len(transcript)} chars")
             
@@ -369,21 +763,130 @@ class ExtractionService:
             logger.error(f"Deepgram transcription failed: {e}")
             raise
 
-    def _transcribe_video(self, file_path: str) -> Tuple[str, dict]:
-        """Extract audio from video and transcribe with Deepgram."""
-        logger.info(f"Extracting audio from video: {file_path}")
+    def _run_ffmpeg_stream(self, input_path: str, consume: Callable[[io.BufferedReader], str]) -> str:
+        """
+        Decode input_path with ffmpeg to a pipe and hand the pipe to consume().
         
-        # Extracted audio temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            wav_path = tmp.name
+        Output is Opus/Ogg, or with KEEP_WAV raw s16le (described to Deepgram
+        by DEEPGRAM_PCM_PARAMS) rather than WAV, whose header can't carry real
+        sizes when written to a pipe. Raises if ffmpeg fails.
+        """
+        proc = (
+            ffmpeg
+            .input(input_path)
+            .output('pipe:1', **(
+                dict(format='s16le', acodec='pcm_s16le', ac=1, ar='16000') if KEEP_WAV
+                else dict(format='ogg', acodec='libopus', ac=1, ar='16000', audio_bitrate='24k')
+            ))
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+        # Drain stderr on the side so ffmpeg never blocks on a full pipe
+        stderr_chunks = []
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        stderr_reader.start()
         
         try:
-            self._convert_to_wav(file_path, wav_path)
-            # Re-route to Deepgram
-            return self._transcribe_deepgram(wav_path)
+            transcript = consume(proc.stdout)
+        except Exception:
+            proc.kill()
+            raise
         finally:
-            if os.path.exists(wav_path):
-                os.remove(wav_path)
+            proc.wait()
+            stderr_reader.join()
+        
+        if proc.returncode != 0:
+            stderr = b"".join(stderr_chunks).decode(errors="ignore")
+            logger.error(f"FFmpeg error: {stderr}")
+            raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+        return transcript
+
+    def _live_transcribe(self, audio: io.BufferedReader) -> str:
+        """
+        Send audio over Deepgram's live websocket while reading results back,
+        so transcription overlaps the upload. Returns the joined final segments.
+        """
+        params = DEEPGRAM_LISTEN_PARAMS + (DEEPGRAM_PCM_PARAMS if KEEP_WAV else "")
+        segments = []
+        send_error = []
+        
+        with ws_connect(
+            f"wss://api.deepgram.com/v1/listen?{params}",
+            additional_headers={"Authorization": f"Token {self.dg_key}"},
+        ) as ws:
+            def send_audio():
+                try:
+                    for chunk in iter_chunks(audio):
+                        ws.send(chunk)
+                    # Ask Deepgram to flush the remaining results and close
+                    ws.send(json.dumps({"type": "CloseStream"}))
+                except Exception as e:
+                    send_error.append(e)
+                    ws.close()
+            
+            sender = threading.Thread(target=send_audio, daemon=True)
+            sender.start()
+            for message in ws:
+                if isinstance(message, str):
+                    result = json.loads(message)
+                    if result.get("type") == "Results" and result.get("is_final"):
+                        text = result["channel"]["alternatives"][0]["transcript"]
+                        if text:
+                            segments.append(text)
+            sender.join()
+        
+        if send_error:
+            raise send_error[0]
+        return " ".join(segments)
+
+    def _transcribe_stream_from_ffmpeg(self, input_path: str) -> Tuple[str, dict]:
+        """
+        Decode input_path with ffmpeg and stream the audio straight into
+        Deepgram, with no intermediate file. Uses the live websocket when
+        DEEPGRAM_LIVE is set (falling back to REST if it fails), else one
+        streamed REST request.
+        """
+        self._require_deepgram_key()
+        
+        model = "nova-2 (REST)"
+        transcript = None
+        if DEEPGRAM_LIVE and ws_connect is not None:
+            logger.info(f"Transcribing with Deepgram Nova-2 (live websocket): {input_path}")
+            try:
+                transcript = self._run_ffmpeg_stream(input_path, self._live_transcribe)
+                model = "nova-2 (live)"
+            except Exception as e:
+                logger.warning(f"Deepgram live streaming failed, falling back to REST: {e}")
+        
+        if transcript is None:
+            logger.info(f"Transcribing with Deepgram Nova-2 (ffmpeg stream): {input_path}")
+            try:
+                transcript = self._run_ffmpeg_stream(
+                    input_path,
+                    lambda audio: self._post_to_deepgram(
+                        iter_chunks(audio),
+                        "audio/l16" if KEEP_WAV else "audio/ogg",
+                        DEEPGRAM_PCM_PARAMS if KEEP_WAV else "",
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"Deepgram transcription failed: {e}")
+                raise
+        
+        logger.info(f"Deepgram transcription complete. Length: {len(transcript)} chars")
+        
+        metadata = {
+            "source": Path(input_path).name,
+            "provider": "deepgram",
+            "model": model
+        }
+        return transcript, metadata
+
+    def _transcribe_video(self, file_path: str) -> Tuple[str, dict]:
+        """Extract audio from video and transcribe with Deepgram."""
+        logger.info(f"Extracting audio from video: {file_path}")
+        
+        # Re-route to Deepgram, piping ffmpeg's output directly
+        return self._cached_transcription(file_path, self._transcribe_stream_from_ffmpeg)
     
     def _run_continuous_recognition(self, wav_path: str) -> Tuple[str, dict]:
        """Deprecated Azure Method - Kept for reference but unused."""
@@ -394,15 +897,25 @@ class ExtractionService:
 # CONVENIENCE FUNCTION
 # =============================================================================
 
+_service: Optional[ExtractionService] = None
+_service_lock = threading.Lock()
+
+
 def extract_text(file_path: str) -> Tuple[str, dict]:
     """
     Convenience function to extract text from any supported file.
     
+    Reuses one ExtractionService (and its R2/Deepgram clients) across calls.
+    
     Usage:
         text, metadata = extract_text("/path/to/file.pdf")
     """
-    service = ExtractionService()
-    return service.extract(file_path)
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ExtractionService()
+    return _service.extract(file_path)
 
 
 # =============================================================================
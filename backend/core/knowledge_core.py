@@ -1,10 +1,27 @@
 import os
+import re
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Any
-from pydantic import BaseModel, Field
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from typing import List, Optional, Union
 from dotenv import load_dotenv
 
 from backend.core.services.llm_factory import LLMFactory
+# Models live in knowledge_models (no LLM/SDK imports); re-exported here for existing imports
+from backend.core.knowledge_models import (  # noqa: F401
+    Concept,
+    Definition,
+    Example,
+    KeyFact,
+    Subsection,
+    Section,
+    NoteContent,
+    KnowledgeCore,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,52 +29,114 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-# --- Pydantic Data Models (Schema) ---
-# (Keeping models same as before)
-class Concept(BaseModel):
-    name: str = Field(description="Name of the core concept")
-    description: str = Field(description="Detailed explanation of the concept")
-    importance_score: int = Field(description="Relevance score from 1-10")
-
-class Definition(BaseModel):
-    term: str = Field(description="The technical term or jargon")
-    definition: str = Field(description="Clear, concise definition")
-    context: str = Field(description="Context in which this term was used")
-
-class Example(BaseModel):
-    description: str = Field(description="Description of the example or metaphor used")
-    relevance: str = Field(description="Why this example is relevant to the topic")
-
-class KeyFact(BaseModel):
-    fact: str = Field(description="An atomic, indisputable fact stated in the content")
-    category: str = Field(description="Category of the fact (e.g., 'Historical', 'Technical', 'Statistical')")
-
-class Subsection(BaseModel):
-    title: str = Field(description="Title of the subsection")
-    summary: str = Field(description="Brief summary of this subsection")
-
-class Section(BaseModel):
-    title: str = Field(description="Title of the main section")
-    summary: str = Field(description="Brief summary of this section")
-    subsections: List[Subsection] = Field(default_factory=list, description="List of subsections")
-
-class NoteContent(BaseModel):
-    heading: str = Field(description="Heading for this block of notes")
-    bullets: List[str] = Field(description="List of detailed note bullet points")
-
-class KnowledgeCore(BaseModel):
-    title: str = Field(description="Overall title of the content")
-    summary: str = Field(description="High-level executive summary")
-    concepts: List[Concept] = Field(description="Key concepts extracted")
-    section_hierarchy: List[Section] = Field(description="Hierarchical outline of the content (Sections and Subsections)")
-    notes: List[NoteContent] = Field(description="Detailed notes grouped by logic/heading")
-    definitions: List[Definition] = Field(description="Dictionary of terms defined")
-    examples: List[Example] = Field(description="List of illustrative examples")
-    key_facts: List[KeyFact] = Field(description="List of key atomic facts")
+KNOWLEDGE_CORE_MODEL = "gemini-2.5-flash"
+
+# Bump whenever the KnowledgeCore models or the cache key normalization
+# change, so stale cached results are never served
+KNOWLEDGE_CORE_SCHEMA_VERSION = "v3"
+
+# Finished Knowledge Cores keyed by SHA-256(prompt, model, schema version, normalized text):
+# re-ingesting identical text skips the LLM call entirely
+KC_CACHE_PATH = os.getenv("KC_CACHE_PATH") or os.path.join(tempfile.gettempdir(), "beeprepared-kc-cache.sqlite3")
+KC_CACHE_DISABLED = os.getenv("KC_CACHE_DISABLED", "").lower() in {"1", "true", "yes"}
+
+# Texts longer than this (~6k tokens) are split and extracted in parallel,
+# then merged; keeps each call's prefill small and its output under the cap
+KC_CHUNK_CHARS = int(os.getenv("KC_CHUNK_CHARS", "24000"))
+KC_CHUNK_CONCURRENCY = 4
+
+# Cache keys ignore whitespace layout and Unicode composition, so transcripts
+# that differ only in those (re-wrapped, re-exported) share one entry. Case and
+# punctuation are kept: "C++" vs "C", "3.14" vs "314" are different content.
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _normalize_for_cache(text: str) -> str:
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into pieces of at most max_chars, breaking at a paragraph,
+    then sentence, then word boundary in the back half of each window.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        window_end = start + max_chars
+        cut = -1
+        for sep in ("\n\n", ". ", "? ", "! ", " "):
+            pos = text.rfind(sep, start + max_chars // 2, window_end)
+            if pos != -1:
+                cut = pos + len(sep)
+                break
+        if cut == -1:
+            cut = window_end
+        chunks.append(text[start:cut].strip())
+        start = cut
+    chunks.append(text[start:].strip())
+    return [c for c in chunks if c]
+
+
+def _dedupe(items: list, key) -> list:
+    """First occurrence wins, order preserved."""
+    seen = set()
+    out = []
+    for item in items:
+        k = key(item).casefold().strip()
+        if k not in seen:
+            seen.add(k)
+            out.append(item)
+    return out
+
+
+def _merge_cores(partials: List[KnowledgeCore]) -> KnowledgeCore:
+    """
+    Deterministically merge per-chunk Knowledge Cores (in text order).
+    Outline, notes and examples are concatenated; concepts, definitions and
+    facts are de-duplicated by name/term/text, keeping the highest importance.
+    """
+    importance = {}
+    for p in partials:
+        for c in p.concepts:
+            k = c.name.casefold().strip()
+            importance[k] = max(importance.get(k, 0), c.importance_score)
+    concepts = [
+        c.model_copy(update={"importance_score": importance[c.name.casefold().strip()]})
+        for c in _dedupe([c for p in partials for c in p.concepts], key=lambda c: c.name)
+    ]
+    return KnowledgeCore(
+        title=partials[0].title,
+        summary=" ".join(p.summary for p in partials if p.summary),
+        concepts=concepts,
+        section_hierarchy=[s for p in partials for s in p.section_hierarchy],
+        notes=[n for p in partials for n in p.notes],
+        definitions=_dedupe([d for p in partials for d in p.definitions], key=lambda d: d.term),
+        examples=[e for p in partials for e in p.examples],
+        key_facts=_dedupe([f for p in partials for f in p.key_facts], key=lambda f: f.fact),
+    )
+
+# Written readably here, sent minified: the indentation and blank lines are
+# pure input tokens on every call
+KNOWLEDGE_CORE_PROMPT = " ".join("""
+        You are an expert Knowledge Engineer. Your goal is to extract a definitive "Source of Truth" from the provided transcript.
+        Analyze the text deeply and extract the following structured data:
+        1. Concepts: The core ideas and abstract concepts discussed.
+        2. Hierarchy: A nested outline of the content (Sections/Subsections).
+        3. Notes: Comprehensive, detailed notes organized by topic.
+        4. Definitions: Specific terminology and their definitions.
+        5. Examples: Concrete examples, metaphors, or stories used to illustrate points.
+        6. Key Facts: Atomic, objective facts mentioned.
+        Be exhaustive. Capture ALL meaningful information.
+        Do not summarize wildly; prefer detail in the Notes section.
+        Ensure the 'section_hierarchy' reflects the logical flow of the lecture/text.
+        """.split())
+
 
 class KnowledgeCoreService:
     def __init__(self):
         self._setup_llm()
+        self._setup_cache()
 
     def _setup_llm(self):
         """Initialize LLM Provider via Factory."""
@@ -66,6 +145,47 @@ class KnowledgeCoreService:
         except Exception as e:
             logger.error(f"Failed to initialize LLM Provider: {e}")
             self.llm = None
+            return
+
+        # Services are built at worker startup, so do the schema work here
+        # rather than on the first ingest job
+        try:
+            self.llm.warm_schema(KnowledgeCore)
+        except Exception as e:
+            logger.warning(f"Knowledge Core schema warm-up failed: {e}")
+
+    def _setup_cache(self):
+        """Open the on-disk result cache (sqlite). Failures just disable it."""
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        if KC_CACHE_DISABLED:
+            return
+        try:
+            os.makedirs(os.path.dirname(KC_CACHE_PATH) or ".", exist_ok=True)
+            self._cache = sqlite3.connect(KC_CACHE_PATH, check_same_thread=False)
+            self._cache.execute("CREATE TABLE IF NOT EXISTS knowledge_cores (key TEXT PRIMARY KEY, core TEXT NOT NULL)")
+            self._cache.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Knowledge Core cache unavailable ({KC_CACHE_PATH}): {e}")
+            self._cache = None
+
+    @staticmethod
+    def _cache_key(prompt: str, model_name: str, clean_text: str) -> str:
+        h = hashlib.sha256()
+        for part in (prompt, model_name, KNOWLEDGE_CORE_SCHEMA_VERSION, _normalize_for_cache(clean_text)):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            row = self._cache.execute("SELECT core FROM knowledge_cores WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _cache_put(self, key: str, core_json: str) -> None:
+        with self._cache_lock:
+            self._cache.execute("INSERT OR REPLACE INTO knowledge_cores (key, core) VALUES (?, ?)", (key, core_json))
+            self._cache.commit()
 
 
     async def generate_knowledge_core(self, clean_text: str) -> KnowledgeCore:
@@ -79,38 +199,60 @@ class KnowledgeCoreService:
         if not clean_text:
             raise ValueError("Input text is empty")
 
-        logger.info("Generating Knowledge Core via LLM Provider (Async Pro Model)...")
+        prompt = KNOWLEDGE_CORE_PROMPT
+        model_to_use = KNOWLEDGE_CORE_MODEL
 
-        prompt = """
-        You are an expert Knowledge Engineer. Your goal is to extract a definitive "Source of Truth" from the provided transcript.
-        
-        Analyze the text deeply and extract the following structured data:
-        1.  **Concepts**: The core ideas and abstract concepts discussed.
-        2.  **Hierarchy**: A nested outline of the content (Sections/Subsections).
-        3.  **Notes**: Comprehensive, detailed notes organized by topic.
-        4.  **Definitions**: Specific terminology and their definitions.
-        5.  **Examples**: Concrete examples, metaphors, or stories used to illustrate points.
-        6.  **Key Facts**: Atomic, objective facts mentioned.
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache_key(prompt, model_to_use, clean_text)
+            try:
+                cached = await asyncio.to_thread(self._cache_get, cache_key)
+                if cached is not None:
+                    logger.info(f"Knowledge Core cache hit ({cache_key[:12]})")
+                    return KnowledgeCore.model_validate_json(cached)
+            except Exception as e:
+                # A bad/unreadable entry just means we regenerate (and overwrite it)
+                logger.warning(f"Knowledge Core cache read failed: {e}")
 
-        Be exhaustive. Capture ALL meaningful information.
-        Do not summarize wildly; prefer detail in the Notes section.
-        Ensure the 'section_hierarchy' reflects the logical flow of the lecture/text.
-        """
+        chunks = _split_text(clean_text, KC_CHUNK_CHARS)
+        if len(chunks) == 1:
+            core = await self._extract_one(clean_text)
+        else:
+            logger.info(f"Splitting {len(clean_text)} chars into {len(chunks)} chunks for parallel extraction")
+            sem = asyncio.Semaphore(KC_CHUNK_CONCURRENCY)
+
+            async def one(chunk: str) -> KnowledgeCore:
+                async with sem:
+                    return await self._extract_one(chunk)
+
+            core = _merge_cores(await asyncio.gather(*(one(c) for c in chunks)))
+
+        if cache_key is not None:
+            try:
+                await asyncio.to_thread(self._cache_put, cache_key, core.model_dump_json())
+            except Exception as e:
+                logger.warning(f"Knowledge Core cache write failed: {e}")
+        return core
+
+    async def _extract_one(self, text: str) -> KnowledgeCore:
+        """One LLM call: text -> KnowledgeCore."""
+        logger.info("Generating Knowledge Core via LLM Provider (Async Pro Model)...")
 
         try:
             # Request High Quality Model (Pro)
             # Fallback handling: provider logs warning if model not found and uses default? 
             # Or implementation throws? Vertex usually supports it.
-            model_to_use = "gemini-2.5-flash" 
             
             # Check if using Gemini provider (names might differ slightly or just use same)
             # Currently VertexLLM and GeminiLLM both accept model_name overrides.
             
+            # The static prompt goes in as the system instruction so every call
+            # shares the same prefix (and the provider reuses one model instance)
             response_model = await self.llm.generate_content_async(
-                prompt=prompt,
-                context=clean_text,
+                prompt=text,
                 schema=KnowledgeCore,
-                model_name=model_to_use
+                model_name=KNOWLEDGE_CORE_MODEL,
+                system_instruction=KNOWLEDGE_CORE_PROMPT
             )
             
             if isinstance(response_model, KnowledgeCore):
@@ -123,9 +265,23 @@ class KnowledgeCoreService:
             logger.error(f"Knowledge Core generation failed: {e}")
             raise e
 
+    async def generate_knowledge_core_batch(
+        self, texts: List[str], concurrency: int = 8
+    ) -> List[Union[KnowledgeCore, Exception]]:
+        """
+        Generate Knowledge Cores for several texts concurrently, at most
+        `concurrency` LLM calls in flight. Results are in input order; a
+        failed text yields its exception instead of failing the batch.
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(text: str) -> KnowledgeCore:
+            async with sem:
+                return await self.generate_knowledge_core(text)
+
+        return await asyncio.gather(*(one(t) for t in texts), return_exceptions=True)
+
 if __name__ == "__main__":
-    import asyncio
-    
     async def test():
         service = KnowledgeCoreService()
         text = "This is a test transcript."
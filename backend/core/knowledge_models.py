@@ -0,0 +1,61 @@
+"""
+Knowledge Core data models (the schema the LLM fills in).
+
+Kept free of LLM/SDK imports so handlers and services can use the models
+without pulling in the provider stack; knowledge_core re-exports them.
+"""
+
+import math
+from typing import List
+from pydantic import BaseModel, Field, field_validator
+
+
+class Concept(BaseModel):
+    name: str = Field(description="Name of the core concept")
+    description: str = Field(description="Detailed explanation of the concept")
+    importance_score: int = Field(ge=1, le=10, description="Relevance score from 1-10")
+
+    @field_validator("importance_score", mode="before")
+    @classmethod
+    def _clamp_importance(cls, v):
+        # Cores stored before the 1-10 bound existed must still load, and
+        # models sometimes answer 7.5 or 11.0; anything else is left to validation
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v):
+            return round(min(max(v, 1), 10))
+        return v
+
+class Definition(BaseModel):
+    term: str = Field(description="The technical term or jargon")
+    definition: str = Field(description="Clear, concise definition")
+    context: str = Field(description="Context in which this term was used")
+
+class Example(BaseModel):
+    description: str = Field(description="Description of the example or metaphor used")
+    relevance: str = Field(description="Why this example is relevant to the topic")
+
+class KeyFact(BaseModel):
+    fact: str = Field(description="An atomic, indisputable fact stated in the content")
+    category: str = Field(description="Category of the fact (e.g., 'Historical', 'Technical', 'Statistical')")
+
+class Subsection(BaseModel):
+    title: str = Field(description="Title of the subsection")
+    summary: str = Field(description="Brief summary of this subsection")
+
+class Section(BaseModel):
+    title: str = Field(description="Title of the main section")
+    summary: str = Field(description="Brief summary of this section")
+    subsections: List[Subsection] = Field(default_factory=list, description="List of subsections")
+
+class NoteContent(BaseModel):
+    heading: str = Field(description="Heading for this block of notes")
+    bullets: List[str] = Field(description="List of detailed note bullet points")
+
+class KnowledgeCore(BaseModel):
+    title: str = Field(description="Overall title of the content")
+    summary: str = Field(description="High-level executive summary")
+    concepts: List[Concept] = Field(description="Key concepts extracted")
+    section_hierarchy: List[Section] = Field(description="Hierarchical outline of the content (Sections and Subsections)")
+    notes: List[NoteContent] = Field(description="Detailed notes grouped by logic/heading")
+    definitions: List[Definition] = Field(description="Dictionary of terms defined")
+    examples: List[Example] = Field(description="List of illustrative examples")
+    key_facts: List[KeyFact] = Field(description="List of key atomic facts")
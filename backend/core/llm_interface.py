@@ -13,7 +13,8 @@ class LLMProvider(ABC):
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         """
         Generate content from the LLM (Synchronous).
@@ -23,6 +24,9 @@ class LLMProvider(ABC):
             context: Context text.
             schema: Pydantic model for structured output.
             model_name: Optional model override (e.g. 'gemini-1.5-pro').
+            system_instruction: Optional static instructions, sent as the model's
+                system instruction (kept out of the per-call contents so the
+                provider can reuse the prefix across calls).
         """
         pass
 
@@ -32,9 +36,17 @@ class LLMProvider(ABC):
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         """
         Generate content from the LLM (Asynchronous).
         """
         pass
+
+    def warm_schema(self, schema: Type[BaseModel]) -> None:
+        """
+        Optionally precompute whatever the provider derives from a response
+        schema, so the first structured call doesn't pay for it. No-op by default.
+        """
+        pass
@@ -1,5 +1,7 @@
 import os
 import logging
+import threading
+from typing import Dict
 from backend.core.llm_interface import LLMProvider
 from backend.core.services.llm_vertex import VertexLLM
 from backend.core.services.llm_gemini import GeminiLLM
@@ -7,13 +9,30 @@ from backend.core.services.llm_gemini import GeminiLLM
 logger = logging.getLogger(__name__)
 
 class LLMFactory:
-    @staticmethod
-    def get_provider() -> LLMProvider:
+    # One provider per LLM_PROVIDER value, shared by every service in the process
+    _instances: Dict[str, LLMProvider] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_provider(cls) -> LLMProvider:
         """
-        Returns an instance of LLMProvider based on configuration.
+        Returns the shared LLMProvider instance for the current configuration.
+        Built on first use (SDK init, model discovery) and reused afterwards.
         """
         provider_type = os.getenv("LLM_PROVIDER", "vertex").lower()
-        
+
+        provider = cls._instances.get(provider_type)
+        if provider is not None:
+            return provider
+
+        with cls._lock:
+            provider = cls._instances.get(provider_type)
+            if provider is None:
+                provider = cls._instances[provider_type] = cls._create_provider(provider_type)
+            return provider
+
+    @staticmethod
+    def _create_provider(provider_type: str) -> LLMProvider:
         if provider_type == "vertex":
             logger.info("Using Vertex AI Provider")
             return VertexLLM()
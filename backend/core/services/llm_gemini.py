@@ -1,7 +1,11 @@
 import os
+import copy
+import json
 import logging
 import asyncio
-from typing import Optional, Type, Union, Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Optional, Type, Union, Any, Dict, Tuple
 from pydantic import BaseModel
 import vertexai
 from vertexai.generative_models import GenerativeModel, GenerationConfig
@@ -77,7 +81,14 @@ def _sanitize_schema_for_vertex(schema: Dict[str, Any], definitions: Dict[str, A
 def _prepare_vertex_schema(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
     """
     Prepares a Pydantic model's JSON schema for use with Vertex AI.
-    extracts definitions and recursively inlines them.
+    Built once per model class; callers get their own copy.
+    """
+    return copy.deepcopy(_build_vertex_schema(pydantic_model))
+
+@lru_cache(maxsize=32)
+def _build_vertex_schema(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Extracts definitions from the model's JSON schema and recursively inlines them.
     """
     raw_schema = pydantic_model.model_json_schema()
     
@@ -97,6 +108,11 @@ def _prepare_vertex_schema(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
     logger.debug(f"Sanitized schema for {pydantic_model.__name__}: {list(sanitized.keys())}")
     return sanitized
 
+@lru_cache(maxsize=32)
+def _schema_json(pydantic_model: Type[BaseModel]) -> str:
+    """Pretty-printed JSON schema for the fallback prompt (built once per model class)."""
+    return json.dumps(pydantic_model.model_json_schema(), indent=2)
+
 class GeminiLLM(LLMProvider):
     def __init__(self):
         project = os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -115,6 +131,10 @@ class GeminiLLM(LLMProvider):
         # 2. Auto-Discovery: Find a working model
         self.model = None
         self.model_name = None
+        self._models: Dict[Tuple[str, Optional[str]], GenerativeModel] = {}
+        # Blocking SDK calls run here rather than on the loop's default executor,
+        # which is shared with everything else and sized to the CPU count
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini")
         self._resolve_working_model()
 
     def _resolve_working_model(self):
@@ -165,12 +185,28 @@ class GeminiLLM(LLMProvider):
         self.model = None
         self.model_name = "unavailable"
 
+    def _get_model(self, model_name: Optional[str] = None, system_instruction: Optional[str] = None):
+        """The discovered model, or a cached instance for a model/system-instruction override."""
+        name = model_name or self.model_name
+        if name == self.model_name and not system_instruction:
+            return self.model
+        key = (name, system_instruction)
+        model = self._models.get(key)
+        if model is None:
+            model = self._models[key] = GenerativeModel(name, system_instruction=system_instruction)
+        return model
+
+    def warm_schema(self, schema: Type[BaseModel]) -> None:
+        """Build and memoize the sanitized response schema ahead of the first call."""
+        _build_vertex_schema(schema)
+
     async def generate_content_async(
         self, 
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         
         # Lazy Init / Retry
@@ -185,10 +221,8 @@ class GeminiLLM(LLMProvider):
         if context:
             contents.append(context)
 
-        # Determine target model (instantiate new one if override provided)
-        target_gen_model = self.model
-        if model_name and model_name != self.model_name:
-             target_gen_model = GenerativeModel(model_name)
+        # Determine target model (cached instance if an override is given)
+        target_gen_model = self._get_model(model_name, system_instruction)
 
         # Attempt 1: With Strict Schema
         if schema:
@@ -202,11 +236,14 @@ class GeminiLLM(LLMProvider):
                     temperature=1.0
                 )
                 
-                response = await asyncio.to_thread(
-                    target_gen_model.generate_content,
-                    contents,
-                    generation_config=generation_config,
-                    stream=False
+                response = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    partial(
+                        target_gen_model.generate_content,
+                        contents,
+                        generation_config=generation_config,
+                        stream=False
+                    )
                 )
                 
                 if response.text:
@@ -222,8 +259,7 @@ class GeminiLLM(LLMProvider):
         # We append the schema to the prompt to guide the model since we can't use response_schema
         fallback_contents = list(contents)
         if schema:
-             import json
-             schema_str = json.dumps(schema.model_json_schema(), indent=2)
+             schema_str = _schema_json(schema)
              fallback_instruction = f"\n\nIMPORTANT: Output valid JSON adhering exactly to this schema:\n```json\n{schema_str}\n```"
              # Append to the last content part (usually the prompt)
              if isinstance(fallback_contents[-1], str):
@@ -238,11 +274,14 @@ class GeminiLLM(LLMProvider):
         )
         
         try:
-            response = await asyncio.to_thread(
-                target_gen_model.generate_content,
-                fallback_contents,
-                generation_config=generation_config,
-                stream=False
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                partial(
+                    target_gen_model.generate_content,
+                    fallback_contents,
+                    generation_config=generation_config,
+                    stream=False
+                )
             )
             
             if schema:
@@ -262,7 +301,8 @@ class GeminiLLM(LLMProvider):
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         
         if not self.model:
@@ -272,9 +312,7 @@ class GeminiLLM(LLMProvider):
         if context:
             contents.append(context)
         
-        target_gen_model = self.model
-        if model_name and model_name != self.model_name:
-             target_gen_model = GenerativeModel(model_name)
+        target_gen_model = self._get_model(model_name, system_instruction)
         
         # Attempt 1: With Strict Schema
         if schema:
@@ -306,8 +344,7 @@ class GeminiLLM(LLMProvider):
         # Attempt 2: Standard JSON Mode (Fallback)
         fallback_contents = list(contents)
         if schema:
-             import json
-             schema_str = json.dumps(schema.model_json_schema(), indent=2)
+             schema_str = _schema_json(schema)
              fallback_instruction = f"\n\nIMPORTANT: Output valid JSON adhering exactly to this schema:\n```json\n{schema_str}\n```"
              if isinstance(fallback_contents[-1], str):
                  fallback_contents[-1] += fallback_instruction
@@ -1,8 +1,10 @@
 import os
+import copy
 import logging
+from functools import lru_cache
 import vertexai
 from vertexai.generative_models import GenerativeModel, GenerationConfig
-from typing import Optional, Type, Union, Any, Dict, List
+from typing import Optional, Type, Union, Any, Dict, List, Tuple
 from pydantic import BaseModel
 from backend.core.llm_interface import LLMProvider
 
@@ -63,7 +65,14 @@ def _sanitize_schema_for_vertex(schema: Dict[str, Any], definitions: Dict[str, A
 def _prepare_vertex_schema(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
     """
     Prepares a Pydantic model's JSON schema for use with Vertex AI.
-    extracts definitions and recursively inlines them.
+    Built once per model class; callers get their own copy.
+    """
+    return copy.deepcopy(_build_vertex_schema(pydantic_model))
+
+@lru_cache(maxsize=32)
+def _build_vertex_schema(pydantic_model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Extracts definitions from the model's JSON schema and recursively inlines them.
     """
     raw_schema = pydantic_model.model_json_schema()
     defs = raw_schema.get('$defs', raw_schema.get('definitions', {}))
@@ -79,6 +88,7 @@ class VertexLLM(LLMProvider):
         self.location = os.getenv("VERTEX_LOCATION", "us-central1")
         self.model_name = os.getenv("VERTEX_MODEL", "gemini-2.5-flash") # Stable alias
         self.api_key = os.getenv("VERTEX_API_KEY") # Optional, if user uses API Key with Vertex
+        self._models: Dict[Tuple[str, Optional[str]], GenerativeModel] = {}
 
         if not self.project_id:
              # Try to infer from default credentials or warn
@@ -102,21 +112,26 @@ class VertexLLM(LLMProvider):
             logger.error(f"Failed to initialize Vertex AI: {e}")
             self.model = None
 
-    def _get_model(self, model_name: Optional[str] = None):
-        if not model_name:
+    def _get_model(self, model_name: Optional[str] = None, system_instruction: Optional[str] = None):
+        if not model_name and not system_instruction:
             return self.model
-        # Create a temporary instance for this request
-        return GenerativeModel(model_name)
+        # Overrides are built once per (model, system instruction) and reused
+        key = (model_name or self.model_name, system_instruction)
+        model = self._models.get(key)
+        if model is None:
+            model = self._models[key] = GenerativeModel(key[0], system_instruction=system_instruction)
+        return model
 
     def generate_content(
         self, 
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         
-        model = self._get_model(model_name)
+        model = self._get_model(model_name, system_instruction)
         if not model:
             raise RuntimeError("Vertex AI model not initialized.")
 
@@ -162,15 +177,20 @@ class VertexLLM(LLMProvider):
             logger.error(f"Vertex AI text generation failed: {e}")
             raise e
 
+    def warm_schema(self, schema: Type[BaseModel]) -> None:
+        """Build and memoize the sanitized response schema ahead of the first call."""
+        _build_vertex_schema(schema)
+
     async def generate_content_async(
         self, 
         prompt: str, 
         context: Optional[str] = None, 
         schema: Optional[Type[BaseModel]] = None,
-        model_name: Optional[str] = None
+        model_name: Optional[str] = None,
+        system_instruction: Optional[str] = None
     ) -> Union[str, BaseModel, Any]:
         
-        model = self._get_model(model_name)
+        model = self._get_model(model_name, system_instruction)
         if not model:
             raise RuntimeError("Vertex AI model not initialized.")
 
@@ -0,0 +1,14 @@
+-- Migration 002: Index the generate-job idempotency lookup
+-- Run this AFTER schema.sql has been applied
+
+-- POST /api/jobs checks for an existing pending/running/completed generate job
+-- with the same (source_artifact_id, target_type) before inserting a new one.
+-- The filter runs server-side on the JSONB payload, so index the extracted keys
+-- to keep the lookup an index scan instead of a per-project sequential scan.
+CREATE INDEX IF NOT EXISTS idx_jobs_generate_idempotency ON public.jobs (
+    project_id,
+    type,
+    status,
+    (payload->>'source_artifact_id'),
+    (payload->>'target_type')
+);
@@ -0,0 +1,24 @@
+-- Migration 003: project_graph RPC
+-- Run this AFTER schema.sql has been applied
+
+-- GET /api/projects/{id}/artifacts needs every artifact and edge of a project
+-- to render the canvas. Return both as one JSON object so the API makes a
+-- single PostgREST round trip instead of one query per table.
+CREATE OR REPLACE FUNCTION project_graph(pid UUID)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'artifacts', (
+            SELECT coalesce(json_agg(a), '[]'::json)
+            FROM public.artifacts a
+            WHERE a.project_id = pid
+        ),
+        'edges', (
+            SELECT coalesce(json_agg(e), '[]'::json)
+            FROM public.artifact_edges e
+            WHERE e.project_id = pid
+        )
+    );
+$$;
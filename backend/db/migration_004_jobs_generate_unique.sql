@@ -0,0 +1,48 @@
+-- Migration 004: Enforce generate-job idempotency in the database
+-- Run this AFTER migration_002 has been applied.
+-- NOTE: Building the unique index fails if duplicate live generate jobs
+-- already exist; mark the extras 'failed' (or delete them) first.
+
+-- At most one pending/running/completed generate job per
+-- (project, source artifact, target type). Failed jobs are excluded so a
+-- failed generation can always be retried.
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_generate_unique ON public.jobs (
+    project_id,
+    (payload->>'source_artifact_id'),
+    (payload->>'target_type')
+)
+WHERE type = 'generate' AND status IN ('pending', 'running', 'completed');
+
+-- Insert a pending job, or return the id of the live job it duplicates.
+-- ON CONFLICT DO NOTHING (rather than DO UPDATE) because
+-- trigger_job_immutable_history rejects any UPDATE of a completed job.
+CREATE OR REPLACE FUNCTION create_job_idem(
+    _project_id UUID,
+    _type job_type,
+    _payload JSONB
+)
+RETURNS UUID AS $$
+DECLARE
+    job_id UUID;
+BEGIN
+    INSERT INTO jobs (project_id, type, status, payload)
+    VALUES (_project_id, _type, 'pending', _payload)
+    ON CONFLICT (project_id, (payload->>'source_artifact_id'), (payload->>'target_type'))
+        WHERE type = 'generate' AND status IN ('pending', 'running', 'completed')
+        DO NOTHING
+    RETURNING id INTO job_id;
+
+    IF job_id IS NULL THEN
+        SELECT id INTO job_id
+        FROM jobs
+        WHERE project_id = _project_id
+          AND type = 'generate'
+          AND status IN ('pending', 'running', 'completed')
+          AND payload->>'source_artifact_id' = _payload->>'source_artifact_id'
+          AND payload->>'target_type' = _payload->>'target_type'
+        LIMIT 1;
+    END IF;
+
+    RETURN job_id;
+END;
+$$ LANGUAGE plpgsql;
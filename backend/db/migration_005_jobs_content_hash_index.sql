@@ -0,0 +1,11 @@
+-- Migration 005: Index ingest jobs by uploaded content hash
+-- Run this AFTER schema.sql has been applied
+
+-- POST /api/projects/{id}/upload hashes each file while streaming it and
+-- reuses an existing pending/running/completed ingest job for the same bytes
+-- in the same project instead of ingesting them again.
+CREATE INDEX IF NOT EXISTS idx_jobs_ingest_content_hash ON public.jobs (
+    project_id,
+    (payload->>'content_hash')
+)
+WHERE type = 'ingest';
@@ -0,0 +1,11 @@
+-- Migration 006: Index project listing order
+-- Run this AFTER migration_001 has been applied
+
+-- GET /api/projects filters by user_id and sorts by updated_at DESC NULLS LAST
+-- (created_at DESC as tie-breaker) in Postgres; this index serves both the
+-- filter and the sort, so ?limit= pages stop after reading N index entries.
+CREATE INDEX IF NOT EXISTS idx_projects_user_updated ON public.projects (
+    user_id,
+    updated_at DESC NULLS LAST,
+    created_at DESC
+);
@@ -0,0 +1,43 @@
+-- Migration 007: create_jobs_batch RPC
+-- Run this AFTER migration_004 has been applied
+
+-- POST /api/jobs/batch creates many jobs in one PostgREST round trip.
+-- Takes a JSON array of {project_id, type, payload} and returns the job ids
+-- in the same order. Single-source generate jobs go through create_job_idem,
+-- so a duplicate (even one earlier in the same batch) resolves to the
+-- existing live job instead of failing the whole batch.
+CREATE OR REPLACE FUNCTION create_jobs_batch(_jobs JSONB)
+RETURNS UUID[] AS $$
+DECLARE
+    job JSONB;
+    job_id UUID;
+    ids UUID[] := '{}';
+BEGIN
+    FOR job IN
+        SELECT t.value
+        FROM jsonb_array_elements(_jobs) WITH ORDINALITY AS t(value, idx)
+        ORDER BY t.idx
+    LOOP
+        IF job->>'type' = 'generate' AND job->'payload' ? 'source_artifact_id' THEN
+            job_id := create_job_idem(
+                (job->>'project_id')::UUID,
+                'generate'::job_type,
+                job->'payload'
+            );
+        ELSE
+            INSERT INTO jobs (project_id, type, status, payload)
+            VALUES (
+                (job->>'project_id')::UUID,
+                (job->>'type')::job_type,
+                'pending',
+                job->'payload'
+            )
+            RETURNING id INTO job_id;
+        END IF;
+
+        ids := ids || job_id;
+    END LOOP;
+
+    RETURN ids;
+END;
+$$ LANGUAGE plpgsql;
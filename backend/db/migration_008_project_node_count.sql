@@ -0,0 +1,20 @@
+-- Migration 008: node_count computed field on projects
+-- Run this AFTER migration_001 has been applied
+
+-- GET /api/projects only needs the number of canvas nodes for each project
+-- card, not the whole canvas_state blob. PostgREST exposes a function that
+-- takes a projects row as a computed column, so `select=...,node_count`
+-- returns the count without shipping canvas_state.
+CREATE OR REPLACE FUNCTION node_count(public.projects)
+RETURNS INTEGER
+LANGUAGE sql
+STABLE
+AS $$
+    -- jsonb_array_length raises on a JSON null or an object, and one bad row
+    -- would fail the whole list; anything that isn't an array counts as 0
+    SELECT CASE
+        WHEN jsonb_typeof($1.canvas_state->'nodes') = 'array'
+        THEN jsonb_array_length($1.canvas_state->'nodes')
+        ELSE 0
+    END;
+$$;
@@ -0,0 +1,73 @@
+"""
+Direct Postgres connection pool for hot read paths.
+
+INVARIANTS:
+- Optional: only active when DATABASE_URL is set and asyncpg is installed
+- Callers must fall back to PostgREST when get_pool() returns None
+- Read-only use; all writes still go through PostgREST/RPCs
+- JSON/JSONB columns decode to Python objects (same shape PostgREST returns)
+"""
+
+import os
+import logging
+
+import orjson
+from dotenv import load_dotenv
+
+try:
+    import asyncpg
+except ImportError:  # Optional dependency
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Kept well under Supabase's direct-connection limit; each API worker gets its own pool
+POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "20"))
+
+_pool = None
+
+
+async def _init_connection(conn) -> None:
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            schema="pg_catalog",
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+        )
+
+
+async def init_pool() -> None:
+    """Create the pool (no-op without DATABASE_URL or asyncpg)."""
+    global _pool
+    dsn = os.environ.get("DATABASE_URL")
+    if _pool is not None or not dsn or asyncpg is None:
+        return
+    try:
+        _pool = await asyncpg.create_pool(
+            dsn,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=300,
+            init=_init_connection,
+        )
+        logger.info("Postgres pool ready (%s-%s connections)", POOL_MIN_SIZE, POOL_MAX_SIZE)
+    except Exception as e:
+        # The API still works over PostgREST; just without the fast path
+        logger.warning("Postgres pool unavailable, using PostgREST only: %s", e)
+        _pool = None
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool():
+    """The shared asyncpg pool, or None if direct access is not configured."""
+    return _pool
@@ -20,7 +20,7 @@ from backend.services.db_interface import DBInterface
 from backend.services.generators import ArtifactGenerator
 from backend.services.binary_renderer import BinaryRenderer
 from backend.services.core_merger import CoreMerger
-from backend.core.knowledge_core import KnowledgeCore, Concept, KeyFact
+from backend.core.knowledge_models import KnowledgeCore, Concept, KeyFact
 
 logger = logging.getLogger(__name__)
 
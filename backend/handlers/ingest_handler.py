@@ -42,6 +42,9 @@ ALLOWED_GENERATIONS: Dict[str, set] = {
 # Source types that IngestHandler can process
 VALID_SOURCE_TYPES = {"youtube", "audio", "video", "pdf", "pptx", "md"}
 
+# source_ref prefix for files uploaded straight to R2 (see /upload-url)
+R2_SOURCE_PREFIX = "r2://"
+
 
 class IngestHandler(JobHandler):
     """
@@ -50,7 +53,7 @@ class IngestHandler(JobHandler):
     Input Payload (frozen):
     {
         "source_type": "youtube | audio | video | pdf | pptx | md",
-        "source_ref": "url or file path",
+        "source_ref": "url, file path, or r2://<key>",
         "original_name": "Lecture 1"
     }
     
@@ -86,7 +89,11 @@ class IngestHandler(JobHandler):
         logger.info(f"[IngestHandler] Step 1: Ingesting {source_type}...")
         
         # Dispatch to correct ingestor method
-        if source_type == "youtube":
+        if source_type != "youtube" and source_ref.startswith(R2_SOURCE_PREFIX):
+            ingest_result = self.ingestor.process_r2_upload(
+                source_ref[len(R2_SOURCE_PREFIX):], str(job.project_id), original_name, source_type
+            )
+        elif source_type == "youtube":
             ingest_result = self.ingestor.process_youtube(source_ref, str(job.project_id))
         elif source_type == "audio":
             ingest_result = self.ingestor.process_audio_upload(source_ref, str(job.project_id), original_name)
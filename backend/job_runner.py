@@ -6,6 +6,7 @@ from uuid import UUID
 from backend.models.jobs import JobModel
 from backend.models.protocol import JobBundle
 from backend.services.db_interface import DBInterface
+from backend.services.graph_cache import graph_cache
 
 # Import real handlers
 from backend.handlers.ingest_handler import IngestHandler
@@ -59,6 +60,8 @@ class JobRunner:
                     # 3. Commit
                     self.db.commit_bundle(bundle)
                     print(f"JobRunner: Job {job.id} Committed Successfully.")
+                    # New artifacts/edges: orphan the cached project graph
+                    await graph_cache.bump_version(job.project_id)
 
                 except Exception as e:
                     print(f"JobRunner: Job {job.id} FAILED during execution")
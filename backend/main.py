@@ -6,25 +6,47 @@ import os
 import logging
 import tempfile
 import asyncio
-from uuid import UUID
-from typing import Optional, List
+import hashlib
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from uuid import UUID, uuid4
+from types import MappingProxyType
+from typing import Annotated, Any, BinaryIO, Dict, List, Literal, Mapping, Optional, Tuple, Union
 import sys
 
 # Allow importing 'backend' package when running from inside backend/ directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 import httpx
+import orjson
+import boto3
+from botocore.config import Config
+from cachetools import TLRUCache, TTLCache
+import jwt
 from dotenv import load_dotenv
 
 from backend.job_runner import JobRunner
+from backend.services.graph_cache import graph_cache
+from backend.services.owner_cache import owner_cache
+from backend.db.pool import close_pool, get_pool, init_pool
 
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# The format above never prints thread/process info, so skip collecting it per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -34,29 +56,104 @@ logger = logging.getLogger(__name__)
 # SUPABASE HTTP CLIENT (No SDK needed)
 # ============================================================================
 
+# One pooled HTTP/2 client for every Supabase call (REST + Auth). Reusing warm
+# keep-alive connections avoids a TCP+TLS handshake on each query. lifespan
+# opens it and closes it on shutdown; get_http() is how callers reach it.
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=120),
+        # Fail fast on connect/pool waits; allow slower RPCs (project_graph) to stream back
+        timeout=httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=5.0),
+    )
+
+
+def get_http() -> httpx.AsyncClient:
+    """
+    The shared Supabase HTTP client (the one lifespan opened).
+    
+    Outside the app lifecycle (scripts, tests), or after a previous lifespan
+    closed it, a fresh client is built instead of using a closed one.
+    """
+    global _http
+    if _http is None or _http.is_closed:
+        _http = _new_http_client()
+    return _http
+
+
+@dataclass(frozen=True, slots=True)
+class _Settings:
+    """Supabase connection settings, parsed and validated once per process."""
+    url: str
+    key: str
+    rest_url: str
+    auth_user_url: str
+    headers: Mapping[str, str]  # Read-only; shared by every request
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> _Settings:
+    """Read Supabase settings from the environment (after load_dotenv)."""
+    url = os.environ.get("SUPABASE_URL", "")
+    key = os.environ.get("SUPABASE_KEY", "")
+    if not url or not key:
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_KEY")
+    return _Settings(
+        url=url,
+        key=key,
+        rest_url=f"{url}/rest/v1",
+        auth_user_url=f"{url}/auth/v1/user",
+        headers=MappingProxyType({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }),
+    )
+
+
 class SupabaseClient:
     """Simple Supabase REST API client using httpx."""
     
-    def __init__(self, token: Optional[str] = None):
-        self.url = os.environ.get("SUPABASE_URL", "")
-        self.key = os.environ.get("SUPABASE_KEY", "")
-        if not self.url or not self.key:
-            raise RuntimeError("Missing SUPABASE_URL or SUPABASE_KEY")
-        self.rest_url = f"{self.url}/rest/v1"
+    def __init__(self, token: Optional[str] = None, http: Optional[httpx.AsyncClient] = None):
+        settings = get_settings()
+        self._http = http
+        self.url = settings.url
+        self.key = settings.key
+        self.rest_url = settings.rest_url
         
         # Use provided user token, otherwise fall back to API key (Anon/Service)
-        auth_header = f"Bearer {token}" if token else f"Bearer {self.key}"
-        
-        self.headers = {
-            "apikey": self.key,
-            "Authorization": auth_header,
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
+        self.headers = {**settings.headers, "Authorization": f"Bearer {token}"} if token else settings.headers
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Resolved per call: get_supabase() outlives any one lifespan's client
+        return self._http or get_http()
     
     def table(self, name: str):
         return SupabaseTable(self, name)
 
+    async def rpc(self, function_name: str, params: dict):
+        """Call a Postgres function exposed by PostgREST (POST /rpc/<name>)."""
+        response = await self.http.post(f"{self.rest_url}/rpc/{function_name}", headers=self.headers, content=orjson.dumps(params))
+        
+        if response.status_code >= 400:
+            raise Exception(f"Supabase error: {response.text}")
+        
+        if response.status_code == 204 or not response.content:
+            return None
+        return orjson.loads(response.content)
+
+
+@dataclass(slots=True)
+class SupaResponse:
+    """Result of SupabaseTable.execute()."""
+    data: Any
+    count: Optional[int] = None  # Set for head() queries
+
 
 class SupabaseTable:
     """Simple table operations for Supabase REST API."""
@@ -70,6 +167,7 @@ class SupabaseTable:
         self._insert_data = None
         self._update_data = None
         self._is_delete = False
+        self._is_head = False
     
     def select(self, columns: str = "*"):
         self._select = columns
@@ -79,6 +177,16 @@ class SupabaseTable:
         self._params.append((column, f"eq.{value}"))
         return self
     
+    def or_(self, filters: str):
+        """Match any of several filters (PostgREST: or=(f1,f2))."""
+        self._params.append(("or", f"({filters})"))
+        return self
+    
+    def json_eq(self, column: str, key: str, value):
+        """Filter on a top-level JSONB key as text (PostgREST: column->>key=eq.value)."""
+        self._params.append((f"{column}->>{key}", f"eq.{value}"))
+        return self
+    
     def in_(self, column: str, values: list):
         """Filter by column value in list of values."""
         if not values:
@@ -88,8 +196,8 @@ class SupabaseTable:
         self._params.append((column, f"in.({values_str})"))
         return self
     
-    def insert(self, data: dict):
-        """Queue an insert operation."""
+    def insert(self, data):
+        """Queue an insert operation (a dict, or a list of dicts for a bulk insert)."""
         self._insert_data = data
         return self
     
@@ -103,20 +211,37 @@ class SupabaseTable:
         self._is_delete = True
         return self
 
+    def head(self):
+        """Only count matching rows (HEAD + Prefer: count=exact); no body is returned."""
+        self._is_head = True
+        return self
+
     def limit(self, count: int):
         """Limit results."""
         self._params.append(("limit", str(count)))
         return self
 
-    def order(self, column: str, desc: bool = False):
-        """Order results."""
-        # PostgREST format: order=column.desc or order=column.asc
+    def offset(self, count: int):
+        """Skip the first `count` results."""
+        self._params.append(("offset", str(count)))
+        return self
+
+    def order(self, column: str, desc: bool = False, nulls_last: bool = False):
+        """Order results (call again to add tie-breaker columns)."""
+        # PostgREST format: order=column.desc or order=column.asc (+ .nullslast),
+        # several columns comma-separated in one param
         direction = "desc" if desc else "asc"
-        logger.info(f"Adding order: {column}.{direction}")
-        self._params.append(("order", f"{column}.{direction}"))
+        nulls = ".nullslast" if nulls_last else ""
+        logger.info("Adding order: %s.%s%s", column, direction, nulls)
+        term = f"{column}.{direction}{nulls}"
+        for i, (key, value) in enumerate(self._params):
+            if key == "order":
+                self._params[i] = ("order", f"{value},{term}")
+                return self
+        self._params.append(("order", term))
         return self
     
-    def execute(self):
+    async def execute(self):
         """Execute the queued operation."""
         url = self.url
         
@@ -124,45 +249,325 @@ class SupabaseTable:
         # We start with the filters
         query_params = self._params.copy()
         
-        with httpx.Client() as http:
-            if self._insert_data is not None:
-                # INSERT
-                response = http.post(self.url, headers=self.client.headers, json=self._insert_data)
-            elif self._update_data is not None:
-                # UPDATE
-                # For update, we must apply filters to URL or params
-                # Supabase expects filters as query params
-                response = http.patch(url, headers=self.client.headers, json=self._update_data, params=query_params)
-            elif self._is_delete:
-                # DELETE
-                response = http.delete(url, headers=self.client.headers, params=query_params)
-            else:
-                # SELECT
-                query_params.append(("select", self._select))
-                response = http.get(url, headers=self.client.headers, params=query_params)
-            
+        if self._insert_data is not None:
+            # INSERT (select() narrows the returned representation, e.g. to "id")
+            response = await self.client.http.post(self.url, headers=self.client.headers, content=orjson.dumps(self._insert_data), params=[("select", self._select)])
+        elif self._update_data is not None:
+            # UPDATE
+            # For update, we must apply filters to URL or params
+            # Supabase expects filters as query params
+            response = await self.client.http.patch(url, headers=self.client.headers, content=orjson.dumps(self._update_data), params=query_params)
+        elif self._is_delete:
+            # DELETE
+            response = await self.client.http.delete(url, headers=self.client.headers, params=query_params)
+        elif self._is_head:
+            # HEAD: row count arrives in Content-Range ("0-0/1", "*/0")
+            headers = {**self.client.headers, "Prefer": "count=exact"}
+            response = await self.client.http.head(url, headers=headers, params=query_params)
             if response.status_code >= 400:
-                raise Exception(f"Supabase error: {response.text}")
-            
-            # Handle 204 No Content
-            if response.status_code == 204 or not response.content:
-                 data = None
-            else:
-                 data = response.json()
-            
-            return type('Response', (), {'data': data})()
+                raise Exception(f"Supabase error: HTTP {response.status_code}")
+            content_range = response.headers.get("content-range", "*/0")
+            return SupaResponse(data=None, count=int(content_range.rsplit("/", 1)[1]))
+        else:
+            # SELECT
+            query_params.append(("select", self._select))
+            response = await self.client.http.get(url, headers=self.client.headers, params=query_params)
+        
+        if response.status_code >= 400:
+            raise Exception(f"Supabase error: {response.text}")
+        
+        # Handle 204 No Content
+        if response.status_code == 204 or not response.content:
+             data = None
+        else:
+             data = orjson.loads(response.content)
+        
+        return SupaResponse(data=data)
 
 
-def get_supabase(token: Optional[str] = None) -> SupabaseClient:
-    """Get Supabase client, optionally with user auth context."""
-    return SupabaseClient(token)
+@lru_cache(maxsize=1)
+def get_supabase() -> SupabaseClient:
+    """
+    Service-role client shared by all requests (built once per process).
+    
+    Endpoints take it as Depends(get_supabase). For a user-scoped client,
+    construct SupabaseClient(token) directly.
+    """
+    return SupabaseClient()
+
+
+def _owner_filter(user_id: str) -> str:
+    """or_() filter matching projects owned by user_id or with no owner (pre-migration_001)."""
+    return f"user_id.eq.{user_id},user_id.is.null"
+
+
+async def _project_access_error(supabase: SupabaseClient, project_id: str) -> HTTPException:
+    """
+    For an owner-filtered query that matched nothing: 404 if the project is
+    missing, 403 if it exists but belongs to someone else.
+    
+    Only runs on the failure path, so the happy path stays one round trip.
+    """
+    exists = await supabase.table("projects").eq("id", project_id).head().execute()
+    if not exists.count:
+        return HTTPException(status_code=404, detail="Project not found")
+    return HTTPException(status_code=403, detail="Access denied")
+
+
+def _canonical_project_id(project_id: str) -> str:
+    """
+    A project ID in canonical UUID form (lowercase, hyphenated), so cache
+    keys match the ones writers invalidate. 404 if it isn't a UUID.
+    """
+    try:
+        return str(UUID(project_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+
+async def get_project_owner(supabase: SupabaseClient, project_id: str) -> Tuple[bool, Optional[str]]:
+    """(exists, owner user_id) for a project, served from owner_cache when warm."""
+    async def load() -> Tuple[bool, Optional[str]]:
+        response = await supabase.table("projects").select("user_id").eq("id", project_id).execute()
+        if not response.data:
+            return False, None
+        return True, response.data[0].get("user_id")
+    
+    return await owner_cache.get_owner(project_id, load)
+
+
+async def _require_project_owner(supabase: SupabaseClient, project_id: str, user_id: str) -> None:
+    """Raise 404 if the project does not exist, 403 if it belongs to someone else."""
+    exists, owner = await get_project_owner(supabase, project_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if owner != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+async def _require_project_writable(supabase: SupabaseClient, project_id: str, user_id: str) -> None:
+    """Like _require_project_owner, but unowned legacy projects are allowed too."""
+    exists, owner = await get_project_owner(supabase, project_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if owner is not None and owner != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+# ============================================================================
+# HTTP CACHING
+# ============================================================================
+
+# Mutable reads: clients always revalidate with If-None-Match (a cheap 304),
+# so an edit is never hidden behind a stale copy. Finished jobs never change.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+IMMUTABLE_CACHE_CONTROL = "private, max-age=3600, immutable"
+TERMINAL_JOB_STATUSES = frozenset({"completed", "failed"})
+
+
+def _etag(body: Union[bytes, Any]) -> str:
+    """Strong ETag from the response body (raw bytes, or data as canonical JSON)."""
+    if not isinstance(body, bytes):
+        body = orjson.dumps(body, option=orjson.OPT_SORT_KEYS)
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _not_modified(if_none_match: Optional[str], etag: str, cache_control: str) -> Optional[Response]:
+    """A 304 response if the client's If-None-Match already has this ETag, else None."""
+    if if_none_match and etag in {t.strip().removeprefix("W/") for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+
+# ============================================================================
+# JOB INSERT BATCHING
+# ============================================================================
+
+# How long the batcher waits for more inserts after the first one arrives
+JOB_BATCH_WINDOW = 0.005
+# Max rows per bulk insert
+JOB_BATCH_MAX = 256
+
+
+class JobInsertBatcher:
+    """
+    Coalesces concurrent job inserts into one bulk POST /jobs.
+    
+    PostgREST accepts a JSON array body and returns the inserted rows in
+    order, so a burst of N create_job calls costs one round trip instead of N.
+    """
+    
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            # A fresh queue per start: a queue binds to the event loop that
+            # first uses it, and a later lifespan may run on a new loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Nothing will flush what is still queued
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+    
+    async def insert(self, row: dict) -> str:
+        """Queue a job row and wait for its id."""
+        if self._task is None:
+            # Not started (e.g. outside the app lifecycle): insert directly
+            return (await self._insert_rows([row]))[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+    
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(JOB_BATCH_WINDOW)
+            while len(batch) < JOB_BATCH_MAX and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+    
+    async def _flush(self, batch: list):
+        try:
+            ids = await self._insert_rows([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            # One bad row (e.g. a deleted project) fails the whole bulk insert;
+            # retry individually so the other callers still get their jobs.
+            logger.warning("Bulk job insert of %s rows failed, retrying individually: %s", len(batch), e)
+            for item in batch:
+                await self._flush([item])
+            return
+        
+        for (_, future), job_id in zip(batch, ids):
+            self._resolve(future, result=job_id)
+    
+    @staticmethod
+    async def _insert_rows(rows: list) -> List[str]:
+        response = await get_supabase().table("jobs").insert(rows).select("id").execute()
+        if not response.data or len(response.data) != len(rows):
+            raise HTTPException(status_code=500, detail="Failed to insert job")
+        return [r["id"] for r in response.data]
+    
+    @staticmethod
+    def _resolve(future: asyncio.Future, result=None, error: Optional[Exception] = None):
+        # The caller may have gone away (client disconnect cancels its future)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+_job_batcher = JobInsertBatcher()
 
 
 # ============================================================================
 # AUTHENTICATION
 # ============================================================================
 
-def get_current_user(authorization: str = Header(None)) -> str:
+# Upper bound on how long a verified token is trusted without re-checking it
+TOKEN_CACHE_TTL = 60
+
+
+def _token_ttu(_key, value, now):
+    # Expire at TOKEN_CACHE_TTL or the JWT's own exp, whichever comes first.
+    # exp is wall-clock while the cache timer is monotonic, so convert via the
+    # remaining lifetime.
+    _, expires_at = value
+    return now + min(TOKEN_CACHE_TTL, expires_at - time.time())
+
+
+# Resolved tokens -> (user_id, exp). Keys are blake2b digests so raw bearer
+# tokens are never kept in memory; entries expire quickly so revoked sessions
+# stop working, and never outlive the token itself.
+_token_cache: TLRUCache = TLRUCache(maxsize=10_000, ttu=_token_ttu)
+# Token lookups currently in flight, so concurrent requests share one auth call.
+_token_inflight: Dict[bytes, asyncio.Task] = {}
+
+
+async def _fetch_user_id(token: str) -> str:
+    """Resolve a bearer token to a user ID via the Supabase Auth API."""
+    try:
+        settings = get_settings()
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="Missing Supabase configuration")
+    
+    # Verify token via Supabase Auth API
+    headers = {
+        "apikey": settings.key,
+        "Authorization": f"Bearer {token}"
+    }
+    
+    response = await get_http().get(settings.auth_user_url, headers=headers)
+    
+    if response.status_code != 200:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    user_data = orjson.loads(response.content)
+    user_id = user_data.get("id")
+    
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Could not extract user ID")
+    
+    return user_id
+
+
+def _token_expiry(token: str) -> float:
+    """Unix expiry of a JWT (signature already checked by Supabase Auth)."""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        exp = None
+    return float(exp) if exp else time.time() + TOKEN_CACHE_TTL
+
+
+async def _lookup_user_id(token: str, key: bytes) -> str:
+    """One in-flight lookup: fetch, cache, then drop the in-flight entry."""
+    try:
+        user_id = await _fetch_user_id(token)
+        _token_cache[key] = (user_id, _token_expiry(token))
+        return user_id
+    finally:
+        _token_inflight.pop(key, None)
+
+
+async def _resolve_user_id(token: str) -> str:
+    """Cached, request-coalescing wrapper around _fetch_user_id."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    cached = _token_cache.get(key)
+    if cached:
+        return cached[0]
+    
+    # No await between the lookup and the registration below, so this is
+    # atomic on the event loop without an explicit lock. The lookup runs as
+    # its own task and every caller shields it, so one client disconnecting
+    # never cancels the lookup the others are waiting on.
+    task = _token_inflight.get(key)
+    if task is None:
+        task = _token_inflight[key] = asyncio.ensure_future(_lookup_user_id(token, key))
+        # Mark the exception retrieved in case every caller has gone away
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(task)
+
+
+async def get_current_user(authorization: str = Header(None)) -> str:
     """
     Validates the Bearer Token sent by the Frontend.
     Returns the User ID if valid.
@@ -180,37 +585,12 @@ def get_current_user(authorization: str = Header(None)) -> str:
         # But usually we just pass the JWT to Supabase Auth
         
         token = authorization.replace("Bearer ", "")
-        supabase_url = os.environ.get("SUPABASE_URL", "")
-        supabase_key = os.environ.get("SUPABASE_KEY", "")
-        
-        if not supabase_url or not supabase_key:
-            raise HTTPException(status_code=500, detail="Missing Supabase configuration")
-        
-        # Verify token via Supabase Auth API
-        auth_url = f"{supabase_url}/auth/v1/user"
-        headers = {
-            "apikey": supabase_key,
-            "Authorization": f"Bearer {token}"
-        }
-        
-        with httpx.Client() as http:
-            response = http.get(auth_url, headers=headers)
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=401, detail="Invalid or expired token")
-            
-            user_data = response.json()
-            user_id = user_data.get("id")
-            
-            if not user_id:
-                raise HTTPException(status_code=401, detail="Could not extract user ID")
-            
-            return user_id
+        return await _resolve_user_id(token)
             
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Auth error: {e}")
+        logger.error("Auth error: %s", e)
         raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
 
@@ -218,34 +598,77 @@ def get_current_user(authorization: str = Header(None)) -> str:
 # FROZEN PAYLOAD CONTRACTS
 # ============================================================================
 
+SourceType = Literal["youtube", "audio", "video", "pdf", "pptx", "md"]
+UploadSourceType = Literal["audio", "video", "pdf", "pptx", "md"]
+TargetType = Literal["quiz", "exam", "notes", "slides", "flashcards"]
+
+
 class IngestPayload(BaseModel):
     """Frozen payload for 'ingest' jobs."""
-    source_type: str  # "youtube | audio | video | pdf | pptx | md"
-    source_ref: str   # URL or file path
+    # Undeclared keys are kept and stored with the job, as before validation moved here
+    model_config = ConfigDict(frozen=True, extra="allow")
+
+    source_type: SourceType
+    source_ref: str   # URL, file path, or r2://<key> for direct uploads
     original_name: str = "Untitled"
 
 
 class GeneratePayload(BaseModel):
     """Frozen payload for 'generate' jobs."""
-    source_artifact_id: Optional[str] = None  # Single source (Legacy)
-    source_artifact_ids: Optional[List[str]] = None  # Multi-source support
-    target_type: str  # "quiz | exam | notes | slides | flashcards"
+    model_config = ConfigDict(frozen=True, extra="allow")
+
+    # UUIDs so the stored payload is canonical (lowercase, hyphenated) and the
+    # create_job_idem unique index can't be dodged by a differently-cased ID
+    source_artifact_id: Optional[UUID] = None  # Single source (Legacy)
+    source_artifact_ids: Optional[List[UUID]] = None  # Multi-source support
+    target_type: TargetType
 
 
-class JobRequest(BaseModel):
-    """Request body for POST /api/jobs."""
+class IngestJobRequest(BaseModel):
+    """Request body for POST /api/jobs with type='ingest'."""
+    model_config = ConfigDict(frozen=True)
+
     project_id: str
-    type: str  # "ingest" | "generate"
-    payload: dict
+    type: Literal["ingest"]
+    payload: IngestPayload
+
+
+class GenerateJobRequest(BaseModel):
+    """Request body for POST /api/jobs with type='generate'."""
+    model_config = ConfigDict(frozen=True)
+
+    project_id: str
+    type: Literal["generate"]
+    payload: GeneratePayload
+
+
+# Request body for POST /api/jobs. Pydantic picks the payload model from
+# "type" in a single validation pass; unknown types or malformed payloads
+# are rejected with 422 before the handler runs.
+JobRequest = Annotated[
+    Union[IngestJobRequest, GenerateJobRequest],
+    Field(discriminator="type"),
+]
 
 
 class JobResponse(BaseModel):
     """Response for job creation."""
+    model_config = ConfigDict(frozen=True)
+
     job_id: str
 
 
+class JobBatchResponse(BaseModel):
+    """Response for batch job creation; IDs are in request order."""
+    model_config = ConfigDict(frozen=True)
+
+    job_ids: List[str]
+
+
 class JobStatusResponse(BaseModel):
     """Response for GET /api/jobs/{job_id}."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     project_id: str
     type: str
@@ -255,6 +678,10 @@ class JobStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+# Only the columns JobStatusResponse exposes are fetched from the jobs table
+JOB_STATUS_COLUMNS = ",".join(JobStatusResponse.model_fields)
+
+
 class ProjectCreate(BaseModel):
     """Request body for POST /api/projects."""
     name: str
@@ -263,6 +690,8 @@ class ProjectCreate(BaseModel):
 
 class ProjectResponse(BaseModel):
     """Response for project creation."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     name: str
     description: Optional[str] = None
@@ -272,14 +701,119 @@ class ProjectResponse(BaseModel):
     updated_at: Optional[str] = None
 
 
+class UploadUrlRequest(BaseModel):
+    """Request body for POST /api/projects/{project_id}/upload-url."""
+    filename: str
+    source_type: UploadSourceType
+    content_type: Optional[str] = None  # If set, the client must PUT with this Content-Type
+
+
+class UploadFinalizeRequest(BaseModel):
+    """Request body for POST /api/projects/{project_id}/upload-finalize."""
+    key: str  # Object key returned by upload-url
+    source_type: UploadSourceType
+    original_name: str = "Untitled"
+
+
+# ============================================================================
+# R2 STORAGE
+# ============================================================================
+
+_r2_lock = threading.Lock()
+_r2: Optional[Tuple[Any, str]] = None
+
+
+def get_r2() -> Tuple[Any, str]:
+    """
+    Shared (boto3 S3 client, bucket) for R2, built once per process.
+    
+    Creating a boto3 client loads service models from disk and builds
+    signers, so it is not done per request. boto3 clients are thread-safe.
+    """
+    global _r2
+    if _r2 is None:
+        with _r2_lock:
+            if _r2 is None:
+                r2_endpoint = os.environ.get("R2_ENDPOINT_URL")
+                r2_key = os.environ.get("R2_ACCESS_KEY_ID")
+                r2_secret = os.environ.get("R2_SECRET_ACCESS_KEY")
+                r2_bucket = os.environ.get("R2_BUCKET_NAME")
+                
+                if not all([r2_endpoint, r2_key, r2_secret, r2_bucket]):
+                    raise HTTPException(status_code=500, detail="R2 not configured")
+                
+                client = boto3.client(
+                    service_name='s3',
+                    endpoint_url=r2_endpoint,
+                    aws_access_key_id=r2_key,
+                    aws_secret_access_key=r2_secret,
+                    region_name='auto',
+                    config=Config(
+                        signature_version='s3v4',
+                        max_pool_connections=50,
+                        retries={'max_attempts': 2},
+                    )
+                )
+                _r2 = (client, r2_bucket)
+    return _r2
+
+
+# Direct-to-R2 uploads: presigned PUT lifetime, and the source_ref scheme the
+# IngestHandler recognises for objects that are already in the bucket
+UPLOAD_URL_TTL_SECONDS = 600
+R2_SOURCE_PREFIX = "r2://"
+
+
+# Read size for streaming uploads to disk (1 MiB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_FILE_SIZE_MB", "100")) << 20
+
+# Uploaded files are stored by content hash: {UPLOAD_STORE_DIR}/{hash[:2]}/{hash}{suffix}
+UPLOAD_STORE_DIR = os.environ.get(
+    "UPLOAD_STORE_DIR", os.path.join(tempfile.gettempdir(), "beeprepared-uploads")
+)
+
+
 # ============================================================================
 # APP SETUP
 # ============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Supabase HTTP client and start background workers; release both on shutdown."""
+    global _http
+    # A new client per lifespan: a previous lifespan in this process (reloader,
+    # repeated TestClient contexts) has already closed its own
+    http = _http = app.state.http = _new_http_client()
+    await init_pool()
+    
+    logger.info("🚀 Starting JobRunner background loop...")
+    runner = JobRunner()
+    runner_task = asyncio.create_task(runner.run_loop())
+    _job_batcher.start()
+    
+    try:
+        yield
+    finally:
+        await _job_batcher.stop()
+        runner_task.cancel()
+        try:
+            await runner_task
+        except asyncio.CancelledError:
+            pass
+        await close_pool()
+        await http.aclose()
+
+
 app = FastAPI(
     title="BeePrepared API",
     description="Backend API for the BeePrepared learning platform",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    # Large canvas_state / artifact payloads serialize much faster with orjson
+    default_response_class=ORJSONResponse,
 )
 
 # CORS (allow all for development)
@@ -291,13 +825,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Start the JobRunner background loop."""
-    logger.info("🚀 Starting JobRunner background loop...")
-    runner = JobRunner()
-    asyncio.create_task(runner.run_loop())
+# Compress JSON responses (artifact graphs, job results) for the browser
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # ============================================================================
@@ -311,7 +840,11 @@ async def health_check():
 
 
 @app.post("/api/jobs", response_model=JobResponse)
-async def create_job(request: JobRequest, user_id: str = Depends(get_current_user)):
+async def create_job(
+    request: JobRequest,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Create a new job.
     
@@ -324,121 +857,256 @@ async def create_job(request: JobRequest, user_id: str = Depends(get_current_use
     The JobRunner will pick up the job asynchronously.
     """
     try:
-        supabase = get_supabase()
-        
         # Verify project ownership
-        project_resp = supabase.table("projects").select("user_id").eq("id", request.project_id).execute()
-        if not project_resp.data:
-            raise HTTPException(status_code=404, detail="Project not found")
-        if project_resp.data[0]["user_id"] != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        await _require_project_owner(supabase, request.project_id, user_id)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to verify project ownership for job creation: {e}")
+        logger.error("Failed to verify project ownership for job creation: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-    logger.info(f"Creating job: type={request.type}, project={request.project_id}")
+    logger.info("Creating job: type=%s, project=%s", request.type, request.project_id)
     
-    # Validate job type
-    if request.type not in {"ingest", "generate"}:
-        raise HTTPException(status_code=400, detail=f"Invalid job type: {request.type}")
-    
-    # Validate payload based on type
-    if request.type == "ingest":
-        try:
-            IngestPayload(**request.payload)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid ingest payload: {e}")
-    elif request.type == "generate":
-        try:
-            GeneratePayload(**request.payload)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid generate payload: {e}")
-    
-    supabase = get_supabase()
+    # Payload was already validated against its type by JobRequest. Only the
+    # keys the client sent are stored (explicit nulls and extra keys included),
+    # so the row matches the request body rather than gaining model defaults.
+    payload = request.payload.model_dump(mode="json", exclude_unset=True)
     
     # =========================================================================
-    # IDEMPOTENCY CHECK: Don't duplicate completed work
+    # IDEMPOTENCY: Don't duplicate completed work
     # =========================================================================
-    if request.type == "generate":
-        source_id = request.payload.get("source_artifact_id")
-        target_type = request.payload.get("target_type")
-        
-        # Check if a completed or running job already exists for this exact work
-        existing = supabase.table("jobs").select("id,status,result").eq(
-            "project_id", request.project_id
-        ).eq("type", "generate").in_(
-            "status", ["completed", "running", "pending"]
-        ).execute()
-        
-        for job in existing.data:
-            payload = job.get("result", {}) if job["status"] == "completed" else {}
-            job_source = job.get("payload", {}).get("source_artifact_id") if "payload" in job else None
-            job_target = job.get("payload", {}).get("target_type") if "payload" in job else None
-            
-            # Need to re-fetch to get payload
-            if job_source is None:
-                full_job = supabase.table("jobs").select("payload").eq("id", job["id"]).execute()
-                if full_job.data:
-                    job_payload = full_job.data[0].get("payload", {})
-                    job_source = job_payload.get("source_artifact_id")
-                    job_target = job_payload.get("target_type")
-            
-            if job_source == source_id and job_target == target_type:
-                if job["status"] == "completed":
-                    logger.info(f"Idempotency: Returning existing completed job {job['id']}")
-                    return JobResponse(job_id=job["id"])
-                elif job["status"] in ["running", "pending"]:
-                    logger.info(f"Idempotency: Returning existing in-progress job {job['id']}")
-                    return JobResponse(job_id=job["id"])
-    
-    # Insert new job
+    # Single-source generate jobs go through create_job_idem (migration_004): a
+    # partial unique index on (project, source_artifact_id, target_type) lets
+    # Postgres insert-or-return the existing pending/running/completed job
+    # atomically, so concurrent duplicate POSTs cannot both insert.
+    # Multi-source jobs carry no single source_artifact_id and are never deduped.
+    dedupe = request.type == "generate" and request.payload.source_artifact_id is not None
+    
     try:
-        response = supabase.table("jobs").insert({
+        if dedupe:
+            job_id = await supabase.rpc("create_job_idem", {
+                "_project_id": request.project_id,
+                "_type": request.type,
+                "_payload": payload,
+            })
+            if not job_id:
+                raise HTTPException(status_code=500, detail="Failed to insert job")
+            
+            logger.info("Created or reused job: %s", job_id)
+            return JobResponse(job_id=job_id)
+        
+        # Insert new job (coalesced with concurrent inserts by the batcher)
+        job_id = await _job_batcher.insert({
             "project_id": request.project_id,
             "type": request.type,
             "status": "pending",
-            "payload": request.payload,
-        }).execute()
+            "payload": payload,
+        })
+        logger.info("Created job: %s", job_id)
         
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=500, detail="Failed to insert job")
+        return JobResponse(job_id=job_id)
         
-        job_id = response.data[0]["id"]
-        logger.info(f"Created job: {job_id}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to create job: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Max jobs per POST /api/jobs/batch
+MAX_CREATE_BATCH = 100
+
+
+@app.post("/api/jobs/batch", response_model=JobBatchResponse)
+async def create_jobs_batch(
+    requests: List[JobRequest],
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
+    """
+    Create several jobs in one request (e.g. every generate job after an ingest).
+    
+    Same validation and idempotency as POST /api/jobs, but all rows are
+    written by one create_jobs_batch RPC call (migration_007) instead of one
+    round trip per job.
+    """
+    if not requests:
+        return JobBatchResponse(job_ids=[])
+    if len(requests) > MAX_CREATE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CREATE_BATCH} jobs per batch")
+    
+    try:
+        # Verify ownership of every project involved (one check per project)
+        project_ids = {r.project_id for r in requests}
+        await asyncio.gather(*(
+            _require_project_owner(supabase, pid, user_id) for pid in project_ids
+        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to verify project ownership for batch job creation: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    logger.info("Creating %d jobs across %d project(s)", len(requests), len(project_ids))
+    
+    jobs = [
+        {
+            "project_id": r.project_id,
+            "type": r.type,
+            "payload": r.payload.model_dump(mode="json", exclude_unset=True),
+        }
+        for r in requests
+    ]
+    
+    try:
+        job_ids = await supabase.rpc("create_jobs_batch", {"_jobs": jobs})
+        if not job_ids or len(job_ids) != len(jobs):
+            raise HTTPException(status_code=500, detail="Failed to insert jobs")
         
-        return JobResponse(job_id=job_id)
+        return JobBatchResponse(job_ids=job_ids)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to create jobs: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Max job IDs per batched status request
+MAX_STATUS_BATCH = 100
+
+
+# Job row + project owner in one round trip over the direct Postgres pool
+_JOB_STATUS_SQL = """
+SELECT j.id::text AS id, j.project_id::text AS project_id, j.type::text AS type,
+       j.status::text AS status, j.payload, j.result, j.error_message,
+       p.user_id::text AS owner_id
+FROM public.jobs j
+JOIN public.projects p ON p.id = j.project_id
+WHERE j.id = $1
+"""
+
+
+async def _fetch_job_direct(pool, job_id: str, user_id: str) -> dict:
+    """get_job_status fast path: same row shape as the PostgREST select."""
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(_JOB_STATUS_SQL, job_uuid)
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if row["owner_id"] != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return {field: row[field] for field in JobStatusResponse.model_fields}
+
+
+# Declared before /api/jobs/{job_id} so "status" is not captured as a job ID
+@app.get("/api/jobs/status", response_model=Dict[str, JobStatusResponse])
+async def get_jobs_status(
+    ids: str = Query(..., description="Comma-separated job IDs"),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
+    """
+    Get the status of several jobs in one call.
+    
+    Returns {job_id: status} for the requested jobs the user owns, keyed by
+    the ID as sent; unknown or malformed IDs and jobs in other users'
+    projects are simply left out.
+    """
+    raw_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if len(raw_ids) > MAX_STATUS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_BATCH} job IDs per request")
+    
+    # Canonical UUID -> ID as sent. A non-UUID would fail the whole in.()
+    # filter (22P02), and can't match a job anyway, so it is dropped here.
+    requested: Dict[str, str] = {}
+    for raw_id in raw_ids:
+        try:
+            requested.setdefault(str(UUID(raw_id)), raw_id)
+        except ValueError:
+            continue
+    if not requested:
+        return {}
+    
+    try:
+        jobs_resp = await supabase.table("jobs").select(JOB_STATUS_COLUMNS).in_("id", list(requested)).execute()
+        jobs = jobs_resp.data or []
+        if not jobs:
+            return {}
+        
+        # One ownership query for all projects involved
+        project_ids = list({job["project_id"] for job in jobs})
+        owned_resp = await (
+            supabase.table("projects")
+            .select("id")
+            .in_("id", project_ids)
+            .eq("user_id", user_id)
+            .execute()
+        )
+        owned = {p["id"] for p in owned_resp.data or []}
+        
+        return {
+            requested.get(job["id"], job["id"]): JobStatusResponse.model_construct(**job)
+            for job in jobs
+            if job["project_id"] in owned
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create job: {e}")
+        logger.error("Failed to get job statuses: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str, user_id: str = Depends(get_current_user)):
+async def get_job_status(
+    job_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Get job status.
     
     Returns current status and result (if completed).
+    Sends an ETag; pollers that echo it in If-None-Match get an empty 304
+    until the job row changes. Completed/failed jobs are marked immutable.
     """
     try:
-        supabase = get_supabase()
-        response = supabase.table("jobs").select("*").eq("id", job_id).execute()
-        
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
-        
-        job = response.data[0]
-        
-        # Verify job ownership via project
-        project_resp = supabase.table("projects").select("user_id").eq("id", job["project_id"]).execute()
-        if not project_resp.data or project_resp.data[0]["user_id"] != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        pool = get_pool()
+        if pool is not None:
+            job = await _fetch_job_direct(pool, job_id, user_id)
+        else:
+            job_resp = await supabase.table("jobs").select(JOB_STATUS_COLUMNS).eq("id", job_id).execute()
+            
+            if not job_resp.data or len(job_resp.data) == 0:
+                raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+            
+            job = job_resp.data[0]
+            
+            # Verify job ownership via project
+            await _require_project_owner(supabase, job["project_id"], user_id)
         
-        return JobStatusResponse(
+        etag = _etag(job)
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL if job["status"] in TERMINAL_JOB_STATUSES
+            else REVALIDATE_CACHE_CONTROL
+        )
+        not_modified = _not_modified(if_none_match, etag, cache_control)
+        if not_modified is not None:
+            return not_modified
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+        
+        # Trusted DB row: skip re-validation here, FastAPI serializes via response_model
+        return JobStatusResponse.model_construct(
             id=job["id"],
             project_id=job["project_id"],
             type=job["type"],
@@ -451,26 +1119,28 @@ async def get_job_status(job_id: str, user_id: str = Depends(get_current_user)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get job: {e}")
+        logger.error("Failed to get job: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/jobs")
-async def list_active_jobs(project_id: str = None, user_id: str = Depends(get_current_user)):
+async def list_active_jobs(
+    project_id: str = None,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     List recent jobs for user/project.
     """
-    logger.info(f"API: list_active_jobs called by user: {user_id} for project: {project_id}")
+    logger.info("API: list_active_jobs called by user: %s for project: %s", user_id, project_id)
     try:
-        supabase = get_supabase()
-        
         # Get projects owned by user to filter jobs
-        logger.info(f"Fetching projects for user: {user_id}")
-        projects_resp = supabase.table("projects").select("id").eq("user_id", user_id).execute()
+        logger.info("Fetching projects for user: %s", user_id)
+        projects_resp = await supabase.table("projects").select("id").eq("user_id", user_id).execute()
         # Handle case where data is None
         projects_data = projects_resp.data or []
         user_project_ids = [p["id"] for p in projects_data]
-        logger.info(f"Found project IDs: {user_project_ids}")
+        logger.info("Found project IDs: %s", user_project_ids)
         
         if not user_project_ids:
             return []
@@ -485,52 +1155,79 @@ async def list_active_jobs(project_id: str = None, user_id: str = Depends(get_cu
             query = query.eq("project_id", project_id)
             
         # Get recent jobs (limit 20)
-        response = query.order("created_at", desc=True).limit(20).execute()
+        response = await query.order("created_at", desc=True).limit(20).execute()
         
         return response.data or []
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to list jobs: {e}")
+        logger.error("Failed to list jobs: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/projects/{project_id}/artifacts")
-async def list_project_artifacts(project_id: str, user_id: str = Depends(get_current_user)):
+async def list_project_artifacts(
+    project_id: str,
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     List all artifacts for a project.
     
-    Returns artifacts and edges (for React Flow rendering).
+    Returns artifacts and edges (for React Flow rendering), with an ETag
+    for If-None-Match revalidation.
     """
+    # The graph cache is keyed by project ID, and job_runner bumps the
+    # canonical form; other casings of the same UUID would never be invalidated
+    project_id = _canonical_project_id(project_id)
     try:
-        supabase = get_supabase()
-        
         # Verify ownership
-        project_resp = supabase.table("projects").select("user_id").eq("id", project_id).execute()
-        if not project_resp.data:
-            raise HTTPException(status_code=404, detail="Project not found")
-        if project_resp.data[0]["user_id"] != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Fetch artifacts
-        artifacts_response = supabase.table("artifacts").select("*").eq("project_id", project_id).execute()
-        
-        # Fetch edges
-        edges_response = supabase.table("artifact_edges").select("*").eq("project_id", project_id).execute()
-        
-        return {
-            "artifacts": artifacts_response.data or [],
-            "edges": edges_response.data or [],
-        }
+        await _require_project_owner(supabase, project_id, user_id)
+        
+        async def load_graph() -> bytes:
+            # Fetch artifacts and edges in one round trip (see migration_003)
+            graph = await supabase.rpc("project_graph", {"pid": project_id}) or {}
+            return orjson.dumps({
+                "artifacts": graph.get("artifacts") or [],
+                "edges": graph.get("edges") or [],
+            })
+        
+        # Served straight from the cached bytes, no re-serialization
+        blob = await graph_cache.get_or_load(project_id, load_graph)
+        etag = _etag(blob)
+        not_modified = _not_modified(if_none_match, etag, REVALIDATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        return Response(
+            content=blob,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL},
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to list artifacts: {e}")
+        logger.error("Failed to list artifacts: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Presigned download URLs are valid for an hour; reuse one for 10 minutes so
+# repeat clicks skip the signing, and clients never get an almost-expired URL
+DOWNLOAD_URL_EXPIRES = 3600
+# Keyed by (storage_path, disposition, mime_type). Only reached after the
+# ownership check, so the URL itself needs no per-user scope.
+_download_url_cache: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+
+
 @app.get("/api/artifacts/{artifact_id}/download")
-async def download_artifact_binary(artifact_id: str, inline: bool = False, user_id: str = Depends(get_current_user)):
+async def download_artifact_binary(
+    artifact_id: str,
+    inline: bool = False,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Get a presigned URL for downloading a binary artifact (PDF, PPTX).
     Optional ?inline=true query param sets Content-Disposition to inline for browser preview.
@@ -538,13 +1235,9 @@ async def download_artifact_binary(artifact_id: str, inline: bool = False, user_
     Returns:
         { "download_url": "...", "format": "pdf|pptx", "filename": "..." }
     """
-    import boto3
-    
     try:
-        supabase = get_supabase()
-        
         # Fetch artifact
-        response = supabase.table("artifacts").select("*").eq("id", artifact_id).execute()
+        response = await supabase.table("artifacts").select("*").eq("id", artifact_id).execute()
         
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Artifact not found")
@@ -552,9 +1245,7 @@ async def download_artifact_binary(artifact_id: str, inline: bool = False, user_
         artifact = response.data[0]
         
         # Verify ownership via project
-        project_resp = supabase.table("projects").select("user_id").eq("id", artifact["project_id"]).execute()
-        if not project_resp.data or project_resp.data[0]["user_id"] != user_id:
-             raise HTTPException(status_code=403, detail="Access denied")
+        await _require_project_owner(supabase, artifact["project_id"], user_id)
         content = artifact.get("content", {})
         binary = content.get("binary")
         
@@ -569,23 +1260,7 @@ async def download_artifact_binary(artifact_id: str, inline: bool = False, user_
             raise HTTPException(status_code=400, detail="Binary missing storage_path")
         
         # Generate presigned URL
-        r2_endpoint = os.environ.get("R2_ENDPOINT_URL")
-        r2_key = os.environ.get("R2_ACCESS_KEY_ID")
-        r2_secret = os.environ.get("R2_SECRET_ACCESS_KEY")
-        r2_bucket = os.environ.get("R2_BUCKET_NAME")
-        
-        if not all([r2_endpoint, r2_key, r2_secret, r2_bucket]):
-            raise HTTPException(status_code=500, detail="R2 not configured")
-        
-        from botocore.config import Config
-        s3_client = boto3.client(
-            service_name='s3',
-            endpoint_url=r2_endpoint,
-            aws_access_key_id=r2_key,
-            aws_secret_access_key=r2_secret,
-            region_name='auto',
-            config=Config(signature_version='s3v4')
-        )
+        s3_client, r2_bucket = get_r2()
         
         # Determine filename and content type
         artifact_type = artifact.get("type", "artifact")
@@ -593,21 +1268,26 @@ async def download_artifact_binary(artifact_id: str, inline: bool = False, user_
         mime_type = binary.get("mime_type", "application/octet-stream")
         filename = f"{artifact_type}_{artifact_id[:8]}.{file_format}"
         
-        # Generate presigned URL with proper response headers
-        try:
-            presigned_url = s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': r2_bucket,
-                    'Key': storage_path,
-                    'ResponseContentDisposition': 'inline' if inline else f'attachment; filename="{filename}"',
-                    'ResponseContentType': mime_type
-                },
-                ExpiresIn=3600  # 1 hour
-            )
-        except Exception as e:
-            logger.error(f"Failed to generate presigned URL: {e}")
-            raise HTTPException(status_code=500, detail=f"S3 signing failed: {str(e)}")
+        # Generate presigned URL with proper response headers (or reuse a recent one)
+        disposition = 'inline' if inline else f'attachment; filename="{filename}"'
+        cache_key = (storage_path, disposition, mime_type)
+        presigned_url = _download_url_cache.get(cache_key)
+        if presigned_url is None:
+            try:
+                presigned_url = s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={
+                        'Bucket': r2_bucket,
+                        'Key': storage_path,
+                        'ResponseContentDisposition': disposition,
+                        'ResponseContentType': mime_type
+                    },
+                    ExpiresIn=DOWNLOAD_URL_EXPIRES
+                )
+            except Exception as e:
+                logger.error("Failed to generate presigned URL: %s", e)
+                raise HTTPException(status_code=500, detail=f"S3 signing failed: {str(e)}")
+            _download_url_cache[cache_key] = presigned_url
 
         return {
             "download_url": presigned_url,
@@ -619,7 +1299,7 @@ async def download_artifact_binary(artifact_id: str, inline: bool = False, user_
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to generate download URL: {e}")
+        logger.error("Failed to generate download URL: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -629,13 +1309,16 @@ class ArtifactUpdate(BaseModel):
 
 
 @app.patch("/api/artifacts/{artifact_id}")
-async def update_artifact(artifact_id: str, updates: ArtifactUpdate, user_id: str = Depends(get_current_user)):
+async def update_artifact(
+    artifact_id: str,
+    updates: ArtifactUpdate,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Update an artifact (e.g. save edited notes).
     """
     try:
-        supabase = get_supabase()
-        
         # specific check for ownership
         # 1. Get artifact to find project_id
         # 2. Check project ownership
@@ -651,7 +1334,7 @@ async def update_artifact(artifact_id: str, updates: ArtifactUpdate, user_id: st
         # If it's a partial update, we need to read the old content first.
         # But we queried `select("project_id")` only. Let's get everything.
         
-        full_art_resp = supabase.table("artifacts").select("*").eq("id", artifact_id).execute()
+        full_art_resp = await supabase.table("artifacts").select("*").eq("id", artifact_id).execute()
         if not full_art_resp.data:
              raise HTTPException(status_code=404, detail="Original artifact lost")
              
@@ -674,92 +1357,201 @@ async def update_artifact(artifact_id: str, updates: ArtifactUpdate, user_id: st
             # Updated_at is handled by Postgres trigger usually, or we can set it if we had the field
         }
         
-        upd_resp = supabase.table("artifacts").update(update_data).eq("id", artifact_id).execute()
+        upd_resp = await supabase.table("artifacts").update(update_data).eq("id", artifact_id).execute()
         
         if not upd_resp.data:
              raise HTTPException(status_code=500, detail="Failed to update artifact")
              
         updated_artifact = upd_resp.data[0]
-        logger.info(f"Updated artifact {artifact_id} content")
+        logger.info("Updated artifact %s content", artifact_id)
+        await graph_cache.bump_version(updated_artifact["project_id"])
         
         return updated_artifact
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to update artifact: {e}")
+        logger.error("Failed to update artifact: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Columns for the project list: metadata only. canvas_state can be many KB,
+# so cards get node_count (migration_008) and the canvas loads the full
+# state from GET /api/projects/{id} or /canvas_state.
+PROJECT_LIST_COLUMNS = "id,name,description,user_id,created_at,updated_at,node_count"
+# Without migration_008 node_count doesn't exist: fetch canvas_state and count here
+PROJECT_LIST_FALLBACK_COLUMNS = "id,name,description,user_id,created_at,updated_at,canvas_state"
+PROJECT_COLUMNS = "id,name,description,user_id,canvas_state,created_at,updated_at"
+
+
 @app.get("/api/projects")
-async def list_projects(user_id: str = Depends(get_current_user)):
+async def list_projects(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
-    List all projects for the authenticated user.
+    List projects for the authenticated user.
     
-    Returns projects ordered by updated_at descending.
+    Returns projects ordered by updated_at descending (newest created first
+    on ties). Optional ?limit=&offset= paginate; without limit, all projects
+    are returned. canvas_state is omitted; node_count carries the number of
+    canvas nodes.
     """
-    logger.info(f"Listing projects for user: {user_id}")
+    logger.info("Listing projects for user: %s", user_id)
+    
+    def projects_query(columns: str):
+        # Fetch projects for this user, ordered by most recent (sorted and
+        # paginated by Postgres, see migration_006 for the index)
+        query = (
+            supabase.table("projects")
+            .select(columns)
+            .eq("user_id", user_id)
+            .order("updated_at", desc=True, nulls_last=True)
+            .order("created_at", desc=True)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        if offset:
+            query = query.offset(offset)
+        return query.execute()
     
     try:
-        supabase = get_supabase()
-        
-        # Fetch projects for this user, ordered by most recent
-        response = supabase.table("projects").select("*").eq("user_id", user_id).execute()
-        
-        projects = response.data or []
-        
-        # Sort by updated_at desc (in Python since our simple client doesn't support order)
-        projects.sort(key=lambda p: p.get("updated_at", p.get("created_at", "")), reverse=True)
-        
-        logger.info(f"Found {len(projects)} projects for user")
+        global _NODE_COUNT_OK
+        projects = None
+        if _NODE_COUNT_OK is not False:
+            try:
+                projects = (await projects_query(PROJECT_LIST_COLUMNS)).data or []
+                _NODE_COUNT_OK = True
+            except Exception as select_error:
+                if _NODE_COUNT_OK or not _is_missing_column_error(select_error):
+                    raise
+                logger.warning("node_count unavailable (%s); counting canvas nodes in the API (apply migration_008)", select_error)
+                _NODE_COUNT_OK = False
+        if projects is None:
+            projects = (await projects_query(PROJECT_LIST_FALLBACK_COLUMNS)).data or []
+            for project in projects:
+                canvas_state = project.pop("canvas_state", None)
+                nodes = canvas_state.get("nodes") if isinstance(canvas_state, dict) else None
+                project["node_count"] = len(nodes) if isinstance(nodes, list) else 0
+        
+        logger.info("Found %s projects for user", len(projects))
+        etag = _etag(projects)
+        not_modified = _not_modified(if_none_match, etag, REVALIDATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
         return projects
         
     except Exception as e:
-        logger.error(f"Failed to list projects: {e}")
+        logger.error("Failed to list projects: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/projects/{project_id}")
-async def get_project(project_id: str, user_id: str = Depends(get_current_user)):
+async def get_project(
+    project_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Get a single project by ID.
     
     Verifies the project belongs to the authenticated user.
     """
     try:
-        supabase = get_supabase()
-        response = supabase.table("projects").select("*").eq("id", project_id).execute()
+        # Ownership is part of the query (owned, or unowned legacy project);
+        # an empty result costs one extra HEAD to tell 404 from 403
+        project_resp = await (
+            supabase.table("projects")
+            .select(PROJECT_COLUMNS)
+            .eq("id", project_id)
+            .or_(_owner_filter(user_id))
+            .execute()
+        )
         
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
+        if not project_resp.data:
+            raise await _project_access_error(supabase, project_id)
+        
+        project = project_resp.data[0]
+        etag = _etag(project)
+        not_modified = _not_modified(if_none_match, etag, REVALIDATE_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return project
         
-        project = response.data[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get project: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/projects/{project_id}/canvas_state")
+async def get_project_canvas_state(
+    project_id: str,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
+    """
+    Get just a project's canvas_state (viewport, nodes, edges).
+    
+    For clients that listed projects (which omits canvas_state) and now need
+    the canvas for one of them.
+    """
+    try:
+        await _require_project_writable(supabase, project_id, user_id)
+        response = await supabase.table("projects").select("canvas_state").eq("id", project_id).execute()
         
-        # Verify ownership
-        if project.get("user_id") and project.get("user_id") != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        if not response.data:
+            raise HTTPException(status_code=404, detail="Project not found")
         
-        return project
+        return {"canvas_state": response.data[0].get("canvas_state")}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get project: {e}")
+        logger.error("Failed to get canvas state: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Whether projects has the migration_001 columns (user_id, canvas_state).
+# None until the first create_project call finds out.
+_FULL_SCHEMA_OK: Optional[bool] = None
+
+# Whether the node_count computed field (migration_008) exists.
+# None until the first list_projects call finds out.
+_NODE_COUNT_OK: Optional[bool] = None
+
+
+def _is_missing_column_error(error: Exception) -> bool:
+    """PostgREST PGRST204 / Postgres 42703: the request referenced an unknown column."""
+    message = str(error)
+    return "PGRST204" in message or "42703" in message
+
+
 @app.post("/api/projects", response_model=ProjectResponse)
-async def create_project(request: ProjectCreate, user_id: str = Depends(get_current_user)):
+async def create_project(
+    request: ProjectCreate,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Create a new project for the authenticated user.
     
     Requires valid Bearer token in Authorization header.
     """
-    logger.info(f"Creating project: {request.name} for user: {user_id}")
+    logger.info("Creating project: %s for user: %s", request.name, user_id)
     
     try:
-        supabase = get_supabase()
-        
         # Build insert data - always include user_id and canvas_state
         # (requires migration to be applied, but is necessary for proper multi-tenancy)
         insert_data = {
@@ -773,22 +1565,33 @@ async def create_project(request: ProjectCreate, user_id: str = Depends(get_curr
             }
         }
         
-        try:
-            response = supabase.table("projects").insert(insert_data).execute()
-        except Exception as insert_error:
-            # If insert failed (possibly due to missing columns), try minimal insert
-            logger.warning(f"Full insert failed: {insert_error}. Trying minimal insert (migration may not be applied)")
-            minimal_data = {
-                "name": request.name,
-                "description": request.description
-            }
-            response = supabase.table("projects").insert(minimal_data).execute()
+        minimal_data = {
+            "name": request.name,
+            "description": request.description
+        }
+        
+        global _FULL_SCHEMA_OK
+        if _FULL_SCHEMA_OK is False:
+            # Already know migration_001 is missing: don't pay for a failing insert
+            response = await supabase.table("projects").insert(minimal_data).execute()
+        else:
+            try:
+                response = await supabase.table("projects").insert(insert_data).execute()
+                _FULL_SCHEMA_OK = True
+            except Exception as insert_error:
+                # Only a missing column means the migration isn't applied;
+                # anything else is a real failure and must surface as a 500
+                if not _is_missing_column_error(insert_error):
+                    raise
+                logger.warning("Full insert failed: %s. Using minimal inserts (migration may not be applied)", insert_error)
+                _FULL_SCHEMA_OK = False
+                response = await supabase.table("projects").insert(minimal_data).execute()
         
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=500, detail="Failed to create project - no data returned")
         
         project = response.data[0]
-        logger.info(f"Created project: {project['id']}")
+        logger.info("Created project: %s", project['id'])
         
         return ProjectResponse(
             id=project["id"],
@@ -803,56 +1606,100 @@ async def create_project(request: ProjectCreate, user_id: str = Depends(get_curr
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to create project: {e}")
+        logger.error("Failed to create project: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _store_upload(src: BinaryIO, suffix: str) -> Tuple[str, str]:
+    """
+    Copy an upload into UPLOAD_STORE_DIR under its content hash.
+    
+    Blocking; run via run_in_threadpool. Returns (path, blake2b hex digest).
+    """
+    # Write to a temp file inside the store (same filesystem, so the final
+    # rename is atomic), hashing as we go
+    os.makedirs(UPLOAD_STORE_DIR, exist_ok=True)
+    hasher = hashlib.blake2b(digest_size=32)
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, dir=UPLOAD_STORE_DIR, suffix=suffix) as tmp:
+        # Fixed-size chunks so peak memory stays bounded
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                tmp.close()
+                os.remove(tmp.name)
+                raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES >> 20} MB limit")
+            hasher.update(chunk)
+            tmp.write(chunk)
+        tmp_name = tmp.name
+    
+    content_hash = hasher.hexdigest()
+    file_dir = os.path.join(UPLOAD_STORE_DIR, content_hash[:2])
+    os.makedirs(file_dir, exist_ok=True)
+    path = os.path.join(file_dir, f"{content_hash}{suffix}")
+    os.replace(tmp_name, path)
+    return path, content_hash
+
+
 @app.post("/api/projects/{project_id}/upload")
 async def upload_and_ingest(
     project_id: str,
     file: UploadFile = File(...),
-    source_type: str = Form(...),
-    user_id: str = Depends(get_current_user)
+    source_type: UploadSourceType = Form(...),
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
 ):
     """
     Upload a file and create an ingest job.
     
     This endpoint:
     1. Verifies project ownership
-    2. Saves the uploaded file temporarily
-    3. Creates an ingest job with the file path
+    2. Saves the uploaded file under its content hash
+    3. Creates an ingest job with the file path (or reuses the job for an
+       identical file already uploaded to this project)
     4. Returns the job_id for polling
     
     source_type must be one of: audio, video, pdf, pptx, md
     """
-    logger.info(f"Upload request: project={project_id}, file={file.filename}, type={source_type}, user={user_id}")
-    
-    if source_type not in {"audio", "video", "pdf", "pptx", "md"}:
-        raise HTTPException(status_code=400, detail=f"Invalid source_type: {source_type}")
+    logger.info("Upload request: project=%s, file=%s, type=%s, user=%s", project_id, file.filename, source_type, user_id)
     
     try:
-        supabase = get_supabase()
-        
-        # Verify project ownership
-        proj_response = supabase.table("projects").select("user_id").eq("id", project_id).execute()
-        if not proj_response.data or len(proj_response.data) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        project_owner = proj_response.data[0].get("user_id")
-        if project_owner and project_owner != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        # Save file to temp directory
-        suffix = f".{file.filename.split('.')[-1]}" if '.' in file.filename else ""
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Reject oversized uploads before copying anything
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES >> 20} MB limit")
+        
+        # Verify project ownership while the file is copied + hashed in a
+        # worker thread (disk I/O never blocks the event loop). Stored files
+        # are content-addressed and may be shared, so a rejected upload's copy
+        # is left in place.
+        suffix = os.path.splitext(file.filename or "")[1]
+        _, (tmp_path, content_hash) = await asyncio.gather(
+            _require_project_writable(supabase, project_id, user_id),
+            run_in_threadpool(_store_upload, file.file, suffix),
+        )
         
-        logger.info(f"Saved uploaded file to: {tmp_path}")
+        logger.info("Saved uploaded file to: %s", tmp_path)
+        
+        # Same bytes already ingested (or being ingested) in this project:
+        # reuse that job instead of extracting and generating again
+        existing = await (
+            supabase.table("jobs")
+            .select("id")
+            .eq("project_id", project_id)
+            .eq("type", "ingest")
+            .json_eq("payload", "content_hash", content_hash)
+            .json_eq("payload", "source_type", source_type)
+            .in_("status", ["pending", "running", "completed"])
+            .limit(1)
+            .execute()
+        )
+        if existing.data:
+            job_id = existing.data[0]["id"]
+            logger.info("Reusing ingest job %s for identical upload %s", job_id, content_hash)
+            return {"job_id": job_id, "filename": file.filename}
         
         # Create ingest job
-        response = supabase.table("jobs").insert({
+        response = await supabase.table("jobs").insert({
             "project_id": project_id,
             "type": "ingest",
             "status": "pending",
@@ -860,57 +1707,149 @@ async def upload_and_ingest(
                 "source_type": source_type,
                 "source_ref": tmp_path,
                 "original_name": file.filename,
-                "user_id": user_id
+                "user_id": user_id,
+                "content_hash": content_hash,
             }
-        }).execute()
+        }).select("id").execute()
         
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=500, detail="Failed to create ingest job")
         
         job_id = response.data[0]["id"]
-        logger.info(f"Created ingest job: {job_id}")
+        logger.info("Created ingest job: %s", job_id)
         
         return {"job_id": job_id, "filename": file.filename}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error("Upload failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/projects/{project_id}/upload-url")
+async def create_upload_url(
+    project_id: str,
+    request: UploadUrlRequest,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
+    """
+    Get a presigned PUT URL so the client can upload straight to R2.
+    
+    Flow: upload-url -> client PUTs the file to upload_url -> upload-finalize
+    with the returned key. The bytes never pass through the API. The
+    multipart /upload endpoint remains for small files.
+    
+    Returns:
+        { "upload_url": "...", "key": "...", "expires_in": 600 }
+    """
+    await _require_project_writable(supabase, project_id, user_id)
+    
+    ext = os.path.splitext(request.filename)[1].lower()
+    key = f"uploads/{user_id}/{uuid4()}{ext}"
+    
+    s3_client, r2_bucket = get_r2()
+    params = {"Bucket": r2_bucket, "Key": key}
+    if request.content_type:
+        params["ContentType"] = request.content_type
+    try:
+        upload_url = s3_client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=UPLOAD_URL_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.error("Failed to generate upload URL: %s", e)
+        raise HTTPException(status_code=500, detail=f"S3 signing failed: {str(e)}")
+    
+    return {"upload_url": upload_url, "key": key, "expires_in": UPLOAD_URL_TTL_SECONDS}
+
+
+@app.post("/api/projects/{project_id}/upload-finalize")
+async def finalize_upload(
+    project_id: str,
+    request: UploadFinalizeRequest,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
+    """
+    Create the ingest job for a file uploaded via upload-url.
+    
+    The key must be one issued to this user, and the object must exist.
+    """
+    if not request.key.startswith(f"uploads/{user_id}/"):
+        raise HTTPException(status_code=403, detail="Upload key does not belong to this user")
+    
+    await _require_project_writable(supabase, project_id, user_id)
+    
+    s3_client, r2_bucket = get_r2()
+    try:
+        await run_in_threadpool(s3_client.head_object, Bucket=r2_bucket, Key=request.key)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Uploaded object not found")
+    
+    try:
+        response = await supabase.table("jobs").insert({
+            "project_id": project_id,
+            "type": "ingest",
+            "status": "pending",
+            "payload": {
+                "source_type": request.source_type,
+                "source_ref": f"{R2_SOURCE_PREFIX}{request.key}",
+                "original_name": request.original_name,
+                "user_id": user_id,
+            }
+        }).select("id").execute()
+        
+        if not response.data:
+            raise HTTPException(status_code=500, detail="Failed to create ingest job")
+        
+        job_id = response.data[0]["id"]
+        logger.info("Created ingest job %s for R2 upload %s", job_id, request.key)
+        return {"job_id": job_id, "filename": request.original_name}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Upload finalize failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/api/projects/{project_id}")
-async def delete_project(project_id: str, user_id: str = Depends(get_current_user)):
+async def delete_project(
+    project_id: str,
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     Delete a project and all related artifacts.
     
-    Verifies ownership before deletion.
+    Only deletes projects owned by the user (404 if missing, 403 if not theirs).
     Note: Cascade delete is handled by PostgreSQL foreign keys.
     """
-    logger.info(f"Deleting project: {project_id} for user: {user_id}")
+    logger.info("Deleting project: %s for user: %s", project_id, user_id)
     
     try:
-        supabase = get_supabase()
-        
-        # Verify ownership first
-        response = supabase.table("projects").select("user_id").eq("id", project_id).execute()
-        
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
+        # Delete only if owned (or unowned legacy project) in one request;
+        # no row back means missing or not ours
+        response = await (
+            supabase.table("projects")
+            .delete()
+            .eq("id", project_id)
+            .or_(_owner_filter(user_id))
+            .execute()
+        )
         
-        project_owner = response.data[0].get("user_id")
-        if project_owner and project_owner != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
+        if not response.data:
+            raise await _project_access_error(supabase, project_id)
         
-        # Delete the project
-        supabase.table("projects").delete().eq("id", project_id).execute()
-        logger.info(f"Deleted project: {project_id}")
+        await owner_cache.invalidate(project_id)
+        logger.info("Deleted project: %s", project_id)
         return {"status": "deleted", "id": project_id}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Delete failed: {e}")
+        logger.error("Delete failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -925,28 +1864,17 @@ class ProjectUpdate(BaseModel):
 async def update_project(
     project_id: str, 
     request: ProjectUpdate, 
-    user_id: str = Depends(get_current_user)
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
 ):
     """
     Update a project's name, description, or canvas state.
     
-    Verifies ownership before update.
+    Only updates projects owned by the user (404 if missing, 403 if not theirs).
     """
-    logger.info(f"Updating project: {project_id} for user: {user_id}")
+    logger.info("Updating project: %s for user: %s", project_id, user_id)
     
     try:
-        supabase = get_supabase()
-        
-        # Verify ownership first
-        response = supabase.table("projects").select("user_id").eq("id", project_id).execute()
-        
-        if not response.data or len(response.data) == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        project_owner = response.data[0].get("user_id")
-        if project_owner and project_owner != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
         # Build update data (only include non-None fields)
         update_data = {}
         if request.name is not None:
@@ -959,31 +1887,40 @@ async def update_project(
         if not update_data:
             raise HTTPException(status_code=400, detail="No update fields provided")
         
-        # Perform update
-        update_response = supabase.table("projects").update(update_data).eq("id", project_id).execute()
+        # Update only if owned (or unowned legacy project) in one request;
+        # no row back means missing or not ours
+        update_response = await (
+            supabase.table("projects")
+            .update(update_data)
+            .eq("id", project_id)
+            .or_(_owner_filter(user_id))
+            .execute()
+        )
         
         if not update_response.data or len(update_response.data) == 0:
-            raise HTTPException(status_code=500, detail="Failed to update project")
+            raise await _project_access_error(supabase, project_id)
         
-        logger.info(f"Updated project: {project_id}")
+        logger.info("Updated project: %s", project_id)
         return update_response.data[0]
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Update failed: {e}")
+        logger.error("Update failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/vault")
-async def list_vault(path: str = "/", user_id: str = Depends(get_current_user)):
+async def list_vault(
+    path: str = "/",
+    user_id: str = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase),
+):
     """
     List all artifacts across all projects for the authenticated user.
     """
     try:
-        supabase = get_supabase()
-        
         # 1. Get all project IDs for this user
-        projects_resp = supabase.table("projects").select("id").eq("user_id", user_id).execute()
+        projects_resp = await supabase.table("projects").select("id").eq("user_id", user_id).execute()
         if not projects_resp.data:
             return {"files": []}
             
@@ -994,7 +1931,7 @@ async def list_vault(path: str = "/", user_id: str = Depends(get_current_user)):
         if not project_ids:
             return {"files": []}
 
-        artifacts_resp = supabase.table("artifacts") \
+        artifacts_resp = await supabase.table("artifacts") \
             .select("*") \
             .in_("project_id", project_ids) \
             .order("created_at", desc=True) \
@@ -1003,7 +1940,7 @@ async def list_vault(path: str = "/", user_id: str = Depends(get_current_user)):
         return {"files": artifacts_resp.data}
         
     except Exception as e:
-        logger.error(f"Vault list failed: {e}")
+        logger.error("Vault list failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
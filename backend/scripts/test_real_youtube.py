@@ -3,6 +3,7 @@ import sys
 import logging
 import json
 import time
+import orjson
 from pathlib import Path
 
 # Ensure backend path is in sys.path
@@ -129,8 +130,8 @@ def main():
 
     # Save Core for debugging
     core_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge_core.json")
-    with open(core_path, "w") as f:
-        f.write(core.model_dump_json(indent=2))
+    with open(core_path, "wb") as f:
+        f.write(orjson.dumps(core.model_dump(mode="json"), option=orjson.OPT_INDENT_2))
         
     logger.info(f"STEP 4: SUCCESS. Saved Knowledge Core to {core_path}")
 
@@ -150,8 +151,8 @@ def main():
     logger.info("  Generating Quiz...")
     quiz = generator.generate_quiz(core)
     if quiz:
-        with open(os.path.join(OUTPUT_DIR, "quiz.json"), "w") as f:
-            f.write(quiz.model_dump_json(indent=2))
+        with open(os.path.join(OUTPUT_DIR, "quiz.json"), "wb") as f:
+            f.write(orjson.dumps(quiz.model_dump(mode="json"), option=orjson.OPT_INDENT_2))
         logger.info("  - Quiz JSON: SUCCESS")
     else:
         logger.error("  - Quiz Generation FAILED")
@@ -18,7 +18,7 @@ import vertexai
 from vertexai.generative_models import GenerativeModel, GenerationConfig
 from dotenv import load_dotenv
 
-from backend.core.knowledge_core import KnowledgeCore
+from backend.core.knowledge_models import KnowledgeCore
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -10,7 +10,7 @@ from backend.core.llm_interface import LLMProvider
 from backend.models.artifacts import (
     FinalExamModel, QuizModel, FlashcardModel, NotesModel, MarkdownNotesModel, SlidesModel, ExamQuestion, ExamSpec
 )
-from backend.core.knowledge_core import KnowledgeCore
+from backend.core.knowledge_models import KnowledgeCore
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -0,0 +1,96 @@
+"""
+GraphCache: Redis cache-aside for project artifact graphs.
+
+INVARIANTS:
+- Caches the serialized {artifacts, edges} blob served by GET /api/projects/{id}/artifacts
+- Keys are versioned per project: v1:proj:{project_id}:graph:{ver}
+- Writers never delete entries; bump_version() orphans them and the TTL reclaims them
+- Redis is optional: without REDIS_URL (or the redis package) every read goes to the loader
+- Redis errors never fail a request; they degrade to a direct load
+"""
+
+import os
+import asyncio
+import logging
+import weakref
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Orphaned versions expire on their own after this many seconds
+GRAPH_TTL_SECONDS = 300
+
+
+class GraphCache:
+    """Versioned, stampede-protected cache of project graph blobs."""
+
+    def __init__(self, url: Optional[str] = None):
+        url = url or os.environ.get("REDIS_URL")
+        self._redis = aioredis.Redis.from_url(url) if (url and aioredis) else None
+        # One lock per cache key so concurrent misses share a single load
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    @staticmethod
+    def _version_key(project_id: str) -> str:
+        return f"v1:proj:{project_id}:ver"
+
+    async def get_or_load(self, project_id: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Return the cached graph blob for a project, loading and storing it on a miss."""
+        if not self.enabled:
+            return await loader()
+
+        try:
+            version = await self._redis.get(self._version_key(project_id)) or b"0"
+            key = f"v1:proj:{project_id}:graph:{version.decode()}"
+            blob = await self._redis.get(key)
+        except Exception as e:
+            logger.warning("Graph cache read failed for %s: %s", project_id, e)
+            return await loader()
+
+        if blob is not None:
+            return blob
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+
+        async with lock:
+            # Another request may have filled the key while we waited
+            try:
+                blob = await self._redis.get(key)
+            except Exception:
+                blob = None
+            if blob is not None:
+                return blob
+
+            blob = await loader()
+            try:
+                await self._redis.set(key, blob, ex=GRAPH_TTL_SECONDS)
+            except Exception as e:
+                logger.warning("Graph cache write failed for %s: %s", project_id, e)
+            return blob
+
+    async def bump_version(self, project_id) -> None:
+        """Invalidate a project's cached graph (call after artifacts/edges change)."""
+        if not self.enabled:
+            return
+        try:
+            await self._redis.incr(self._version_key(str(project_id)))
+        except Exception as e:
+            logger.warning("Graph cache invalidation failed for %s: %s", project_id, e)
+
+
+graph_cache = GraphCache()
@@ -0,0 +1,95 @@
+"""
+OwnerCache: two-tier cache of project_id -> owner user_id.
+
+INVARIANTS:
+- Only ownership is cached; missing projects are never cached (404s always hit the DB)
+- Unowned legacy projects are cached too, stored as "" in Redis and None in-process
+- Tier 1 is an in-process TTL cache (30s), tier 2 is Redis (300s, shared across workers)
+- invalidate() must be called when a project is deleted
+- Both tiers are keyed by the canonical UUID, so every casing of an ID shares one entry
+- Redis is optional and fail-open: errors fall through to the loader
+"""
+
+import os
+import logging
+from uuid import UUID
+from typing import Awaitable, Callable, Optional, Tuple
+
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+LOCAL_TTL_SECONDS = 30
+REDIS_TTL_SECONDS = 300
+
+# (exists, owner_user_id)
+OwnerLookup = Tuple[bool, Optional[str]]
+
+
+class OwnerCache:
+    """Cache-aside for project ownership lookups."""
+
+    def __init__(self, url: Optional[str] = None):
+        url = url or os.environ.get("REDIS_URL")
+        self._redis = aioredis.Redis.from_url(url) if (url and aioredis) else None
+        self._local: TTLCache = TTLCache(maxsize=10_000, ttl=LOCAL_TTL_SECONDS)
+
+    @staticmethod
+    def _canonical(project_id) -> str:
+        """Lowercase hyphenated UUID; anything that isn't a UUID is used as-is."""
+        try:
+            return str(UUID(str(project_id)))
+        except ValueError:
+            return str(project_id)
+
+    @staticmethod
+    def _key(project_id: str) -> str:
+        return f"po:{project_id}"
+
+    async def get_owner(self, project_id: str, loader: Callable[[], Awaitable[OwnerLookup]]) -> OwnerLookup:
+        """Return (exists, owner) for a project, consulting the caches before the loader."""
+        project_id = self._canonical(project_id)
+        if project_id in self._local:
+            return True, self._local[project_id]
+
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(self._key(project_id))
+            except Exception as e:
+                logger.warning("Owner cache read failed for %s: %s", project_id, e)
+                cached = None
+            if cached is not None:
+                owner = cached.decode() or None
+                self._local[project_id] = owner
+                return True, owner
+
+        exists, owner = await loader()
+        if exists:
+            self._local[project_id] = owner
+            if self._redis is not None:
+                try:
+                    await self._redis.set(self._key(project_id), owner or "", ex=REDIS_TTL_SECONDS)
+                except Exception as e:
+                    logger.warning("Owner cache write failed for %s: %s", project_id, e)
+        return exists, owner
+
+    async def invalidate(self, project_id) -> None:
+        """Forget a project's owner (call after the project is deleted)."""
+        project_id = self._canonical(project_id)
+        self._local.pop(project_id, None)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._key(project_id))
+            except Exception as e:
+                logger.warning("Owner cache invalidation failed for %s: %s", project_id, e)
+
+
+owner_cache = OwnerCache()
@@ -0,0 +1,96 @@
+"""
+Tests for DOCX text extraction (XPath over the body XML).
+
+Documents are built with python-docx, whose Paragraph.text is the reference
+for what each paragraph should read as.
+
+Run with: python -m pytest tests/test_docx_extraction.py -v
+"""
+
+import pytest
+import sys
+import os
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core.extraction import ExtractionService
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def build_document(path):
+    doc = Document()
+    doc.add_paragraph("Mitosis\tphases")
+    doc.add_paragraph("")
+
+    run = doc.add_paragraph("Pro").add_run("phase")
+    run.add_break()
+    run.add_text("Metaphase")
+    run.add_break(WD_BREAK.PAGE)
+    run.add_text("Anaphase")
+
+    para = doc.add_paragraph("See ")
+    para._p.append(parse_xml(f"<w:hyperlink {W_NS}><w:r><w:t>the atlas</w:t></w:r></w:hyperlink>"))
+
+    # Text box content sits in a nested w:txbxContent and is not paragraph text
+    para = doc.add_paragraph("Figure:")
+    para._p.append(parse_xml(
+        f"<w:r {W_NS}><w:pict><w:txbxContent><w:p><w:r><w:t>INSIDE BOX</w:t></w:r></w:p></w:txbxContent></w:pict></w:r>"
+    ))
+
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Stage"
+    table.cell(0, 1).text = "Length"
+    table.cell(1, 1).text = "1h\n2h"
+
+    doc.save(path)
+
+
+def reference_text(path):
+    """What the python-docx object model reads (paragraphs, then table rows)."""
+    doc = Document(path)
+    parts = [p.text for p in doc.paragraphs if p.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            cells = [t for t in (c.text.strip() for c in row.cells) if t]
+            if cells:
+                parts.append(" | ".join(cells))
+    return "\n\n".join(parts)
+
+
+class TestExtractDocx:
+
+    def setup_method(self):
+        self.service = ExtractionService()
+
+    def test_paragraphs_and_tables(self, tmp_path):
+        path = str(tmp_path / "notes.docx")
+        build_document(path)
+
+        text, metadata = self.service._extract_docx(path)
+
+        # Line breaks become \n; page breaks add nothing, as in python-docx
+        assert text == (
+            "Mitosis\tphases\n\n"
+            "Prophase\nMetaphaseAnaphase\n\n"
+            "See the atlas\n\n"
+            "Figure:\n\n"
+            "Stage | Length\n\n"
+            "1h\n2h"
+        )
+        assert "INSIDE BOX" not in text
+        assert metadata == {"paragraph_count": 5, "source": "notes.docx"}
+
+    def test_matches_python_docx(self, tmp_path):
+        path = str(tmp_path / "notes.docx")
+        build_document(path)
+        assert self.service._extract_docx(path)[0] == reference_text(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""
+Tests for ExtractionService.extract() result caching.
+
+Run with: python -m pytest tests/test_extract_cache.py -v
+"""
+
+import pytest
+import sys
+import os
+import io
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core import extraction
+from backend.core.extraction import ExtractionService
+
+
+class TestExtractCache:
+
+    def setup_method(self):
+        self.calls = 0
+        self.service = self.counting_service()
+
+    def counting_service(self):
+        """An ExtractionService whose text extractor counts its calls into self.calls."""
+        service = ExtractionService()
+        read_text = service._extractors["text"]
+
+        def counting_extractor(*args):
+            self.calls += 1
+            return read_text(*args)
+
+        service._extractors["text"] = counting_extractor
+        return service
+
+    def write(self, path, text, mtime_ns=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return str(path)
+
+    def test_unchanged_file_extracted_once(self, tmp_path):
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle")
+
+        first = self.service.extract(path)
+        second = self.service.extract(path)
+
+        assert first == second
+        assert first[0] == "Krebs cycle"
+        assert self.calls == 1
+
+    def test_changed_file_re_extracted(self, tmp_path):
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle", mtime_ns=1_000_000_000)
+        self.service.extract(path)
+
+        # Same size, newer mtime
+        self.write(path, "Calvin cycl", mtime_ns=2_000_000_000)
+        assert self.service.extract(path)[0] == "Calvin cycl"
+        assert self.calls == 2
+
+    def test_cached_metadata_not_shared(self, tmp_path):
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle")
+
+        _, metadata = self.service.extract(path)
+        metadata["source"] = "mutated"
+        metadata["extra"] = True
+
+        _, again = self.service.extract(path)
+        assert again["source"] == "notes.txt"
+        assert "extra" not in again
+
+    def test_in_memory_source_not_cached(self):
+        for _ in range(2):
+            text, _ = self.service.extract("upload.txt", source=io.BytesIO(b"Krebs cycle"))
+            assert text == "Krebs cycle"
+        assert self.calls == 2
+        assert len(self.service._extract_cache) == 0
+
+    def test_bounded_by_total_characters(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(extraction, "EXTRACT_CACHE_SIZE", 20)
+        service = self.counting_service()
+        a, b, c = (self.write(tmp_path / f"{name}.txt", name * 8) for name in "abc")
+
+        for path in (a, b, a, c, a, b):
+            service.extract(path)
+        # Two 8-char texts fit in 20: a, b, c miss; a hits; c evicts b; a hits; b misses again
+        assert self.calls == 4
+        assert service._extract_cache.currsize <= 20
+
+    def test_text_larger_than_cache_not_kept(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(extraction, "EXTRACT_CACHE_SIZE", 5)
+        service = self.counting_service()
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle")
+
+        assert service.extract(path)[0] == service.extract(path)[0] == "Krebs cycle"
+        assert self.calls == 2
+        assert len(service._extract_cache) == 0
+
+    def test_cache_false_bypasses(self, tmp_path):
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle")
+        self.service.extract(path, cache=False)
+        self.service.extract(path, cache=False)
+        assert self.calls == 2
+        assert len(self.service._extract_cache) == 0
+
+    def test_r2_temp_files_not_cached(self, monkeypatch):
+        class FakeBody:
+            def close(self):
+                pass
+
+        class FakeS3:
+            # Too big for the in-memory path, so it goes through a temp file
+            def get_object(self, Bucket, Key):
+                return {"ContentLength": extraction.IN_MEMORY_MAX_BYTES + 1, "Body": FakeBody()}
+
+            def download_file(self, bucket, key, path, Config=None):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("Krebs cycle")
+
+        monkeypatch.setattr(self.service, "s3_client", FakeS3())
+
+        assert self.service.extract_from_r2("uploads/notes.txt")[0] == "Krebs cycle"
+        assert len(self.service._extract_cache) == 0
+
+    def test_disabled_with_zero_size(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(extraction, "EXTRACT_CACHE_SIZE", 0)
+        service = ExtractionService()
+        assert service._extract_cache is None
+
+        path = self.write(tmp_path / "notes.txt", "Krebs cycle")
+        assert service.extract(path)[0] == service.extract(path)[0] == "Krebs cycle"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
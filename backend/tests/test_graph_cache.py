@@ -0,0 +1,179 @@
+"""
+Tests for GraphCache (versioned project graph cache).
+
+Redis is replaced by an in-memory stand-in; no server is needed.
+
+Run with: python -m pytest tests/test_graph_cache.py -v
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+from backend.services.graph_cache import GraphCache, GRAPH_TTL_SECONDS
+
+
+class FakeRedis:
+    """The get/set/incr subset GraphCache uses, stored in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.fail = False
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    async def incr(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+class CountingLoader:
+    def __init__(self, blob=b'{"artifacts":[],"edges":[]}', delay=0):
+        self.blob = blob
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.blob
+
+
+class TestGraphCache:
+
+    def setup_method(self):
+        self.cache = GraphCache(url="")
+        self.redis = self.cache._redis = FakeRedis()
+
+    def test_disabled_always_loads(self):
+        cache = GraphCache(url="")
+        cache._redis = None
+        loader = CountingLoader()
+
+        async def run():
+            await cache.get_or_load("p1", loader)
+            await cache.get_or_load("p1", loader)
+            await cache.bump_version("p1")
+
+        asyncio.run(run())
+        assert loader.calls == 2
+
+    def test_hit_after_first_load(self):
+        loader = CountingLoader()
+
+        async def run():
+            first = await self.cache.get_or_load("p1", loader)
+            second = await self.cache.get_or_load("p1", loader)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == second == loader.blob
+        assert loader.calls == 1
+        assert self.redis.ttls["v1:proj:p1:graph:0"] == GRAPH_TTL_SECONDS
+
+    def test_bump_version_orphans_old_entry(self):
+        old, new = CountingLoader(b"old"), CountingLoader(b"new")
+
+        async def run():
+            await self.cache.get_or_load("p1", old)
+            await self.cache.bump_version("p1")
+            return await self.cache.get_or_load("p1", new)
+
+        assert asyncio.run(run()) == b"new"
+        assert new.calls == 1
+        # The old version is left for the TTL, not deleted
+        assert self.redis.data["v1:proj:p1:graph:0"] == b"old"
+        assert self.redis.data["v1:proj:p1:graph:1"] == b"new"
+
+    def test_bump_is_per_project(self):
+        loader = CountingLoader()
+
+        async def run():
+            await self.cache.get_or_load("p1", loader)
+            await self.cache.get_or_load("p2", loader)
+            await self.cache.bump_version("p2")
+            await self.cache.get_or_load("p1", loader)
+            await self.cache.get_or_load("p2", loader)
+
+        asyncio.run(run())
+        assert loader.calls == 3
+
+    def test_concurrent_misses_share_one_load(self):
+        loader = CountingLoader(delay=0.01)
+
+        async def run():
+            return await asyncio.gather(*(self.cache.get_or_load("p1", loader) for _ in range(10)))
+
+        assert asyncio.run(run()) == [loader.blob] * 10
+        assert loader.calls == 1
+
+    def test_redis_errors_fall_back_to_loader(self):
+        self.redis.fail = True
+        loader = CountingLoader()
+
+        async def run():
+            blob = await self.cache.get_or_load("p1", loader)
+            await self.cache.bump_version("p1")
+            return blob
+
+        assert asyncio.run(run()) == loader.blob
+        assert loader.calls == 1
+
+
+class TestArtifactsEndpointKey:
+    """GET /api/projects/{id}/artifacts reads the key writers invalidate."""
+
+    @pytest.fixture(autouse=True)
+    def fakes(self, monkeypatch):
+        self.keys = []
+
+        async def allow(supabase, project_id, user_id):
+            pass
+
+        async def get_or_load(project_id, loader):
+            self.keys.append(project_id)
+            return b'{"artifacts":[],"edges":[]}'
+
+        monkeypatch.setattr(main, "_require_project_owner", allow)
+        monkeypatch.setattr(main.graph_cache, "get_or_load", get_or_load)
+        main.app.dependency_overrides[main.get_current_user] = lambda: "user-1"
+        main.app.dependency_overrides[main.get_supabase] = lambda: None
+        self.client = TestClient(main.app)
+        yield
+        main.app.dependency_overrides.clear()
+
+    def test_any_casing_uses_canonical_key(self):
+        project_id = str(uuid4())
+        for sent in (project_id, project_id.upper(), project_id.replace("-", "")):
+            assert self.client.get(f"/api/projects/{sent}/artifacts").status_code == 200
+        assert self.keys == [project_id] * 3
+
+    def test_malformed_id_is_404(self):
+        assert self.client.get("/api/projects/not-a-uuid/artifacts").status_code == 404
+        assert self.keys == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
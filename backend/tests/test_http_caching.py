@@ -0,0 +1,63 @@
+"""
+Tests for the ETag helpers in main.py (_etag, _not_modified).
+
+Run with: python -m pytest tests/test_http_caching.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.main import _etag, _not_modified, REVALIDATE_CACHE_CONTROL
+
+
+class TestEtag:
+
+    def test_strong_quoted_tag(self):
+        tag = _etag(b"hello")
+        assert tag.startswith('"') and tag.endswith('"')
+        assert not tag.startswith("W/")
+
+    def test_same_body_same_tag(self):
+        assert _etag(b'{"a":1}') == _etag(b'{"a":1}')
+
+    def test_different_body_different_tag(self):
+        assert _etag({"name": "Biology"}) != _etag({"name": "Chemistry"})
+
+    def test_key_order_does_not_matter(self):
+        assert _etag({"a": 1, "b": [1, 2]}) == _etag({"b": [1, 2], "a": 1})
+
+    def test_data_hashed_as_canonical_json(self):
+        assert _etag({"b": 2, "a": 1}) == _etag(b'{"a":1,"b":2}')
+
+
+class TestNotModified:
+
+    def setup_method(self):
+        self.tag = _etag(b"body")
+
+    def test_matching_tag_gives_304(self):
+        response = _not_modified(self.tag, self.tag, REVALIDATE_CACHE_CONTROL)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == self.tag
+        assert response.headers["Cache-Control"] == REVALIDATE_CACHE_CONTROL
+        assert response.body == b""
+
+    @pytest.mark.parametrize("header", [None, "", '"something-else"', "*"])
+    def test_no_match_gives_none(self, header):
+        assert _not_modified(header, self.tag, REVALIDATE_CACHE_CONTROL) is None
+
+    def test_tag_in_list(self):
+        header = f'"old-1", {self.tag} ,"old-2"'
+        assert _not_modified(header, self.tag, REVALIDATE_CACHE_CONTROL).status_code == 304
+
+    def test_weak_form_matches(self):
+        # Proxies that re-encode the body send the tag back in weak form
+        assert _not_modified(f"W/{self.tag}", self.tag, REVALIDATE_CACHE_CONTROL).status_code == 304
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
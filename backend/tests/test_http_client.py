@@ -0,0 +1,80 @@
+"""
+Tests for the shared Supabase HTTP client's lifecycle in main.py.
+
+Background workers and the Postgres pool are replaced with no-ops so the
+app's lifespan can run without any external services.
+
+Run with: python -m pytest tests/test_http_client.py -v
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+
+
+class IdleRunner:
+    async def run_loop(self):
+        await asyncio.Event().wait()
+
+
+async def noop():
+    pass
+
+
+class TestHttpClientLifecycle:
+
+    @pytest.fixture(autouse=True)
+    def offline_lifespan(self, monkeypatch):
+        monkeypatch.setattr(main, "JobRunner", IdleRunner)
+        monkeypatch.setattr(main, "init_pool", noop)
+        monkeypatch.setattr(main, "close_pool", noop)
+        monkeypatch.setattr(main, "_http", None)
+
+    def test_lifespan_opens_and_closes_client(self):
+        with TestClient(main.app):
+            http = main.app.state.http
+            assert not http.is_closed
+            assert main.get_http() is http
+        assert http.is_closed
+
+    def test_repeated_lifespans_get_open_clients(self):
+        with TestClient(main.app):
+            first = main.app.state.http
+        with TestClient(main.app):
+            second = main.app.state.http
+            assert second is not first
+            assert not second.is_closed
+            assert main.get_http() is second
+
+    def test_shared_supabase_client_follows_lifespan(self, monkeypatch):
+        monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+        monkeypatch.setenv("SUPABASE_KEY", "service-key")
+        main.get_settings.cache_clear()
+        try:
+            client = main.SupabaseClient()
+            with TestClient(main.app):
+                assert client.http is main.app.state.http
+            with TestClient(main.app):
+                assert client.http is main.app.state.http
+                assert not client.http.is_closed
+        finally:
+            main.get_settings.cache_clear()
+
+    def test_closed_client_rebuilt_outside_lifespan(self):
+        with TestClient(main.app):
+            pass
+        http = main.get_http()
+        assert not http.is_closed
+        asyncio.run(http.aclose())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
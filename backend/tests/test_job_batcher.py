@@ -0,0 +1,111 @@
+"""
+Tests for JobInsertBatcher (bulk job inserts) in main.py.
+
+The PostgREST insert is replaced by a fake that records each bulk call.
+
+Run with: python -m pytest tests/test_job_batcher.py -v
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+from backend.main import JobInsertBatcher
+
+
+class FakeJobsTable:
+    """Stands in for JobInsertBatcher._insert_rows; rows with "bad" set fail the whole call."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, rows):
+        self.calls.append(len(rows))
+        if any(row.get("bad") for row in rows):
+            raise HTTPException(status_code=500, detail="Failed to insert job")
+        return [f"job-{row['n']}" for row in rows]
+
+
+class TestJobInsertBatcher:
+
+    @pytest.fixture(autouse=True)
+    def fake_table(self, monkeypatch):
+        self.table = FakeJobsTable()
+        monkeypatch.setattr(JobInsertBatcher, "_insert_rows", staticmethod(self.table))
+
+    async def _with_batcher(self, body):
+        batcher = JobInsertBatcher()
+        batcher.start()
+        try:
+            return await body(batcher)
+        finally:
+            await batcher.stop()
+
+    def test_unstarted_inserts_directly(self):
+        assert asyncio.run(JobInsertBatcher().insert({"n": 1})) == "job-1"
+        assert self.table.calls == [1]
+
+    def test_concurrent_inserts_share_one_call(self):
+        async def body(batcher):
+            return await asyncio.gather(*(batcher.insert({"n": n}) for n in range(10)))
+
+        assert asyncio.run(self._with_batcher(body)) == [f"job-{n}" for n in range(10)]
+        assert self.table.calls == [10]
+
+    def test_batches_capped_at_max(self, monkeypatch):
+        monkeypatch.setattr(main, "JOB_BATCH_MAX", 3)
+
+        async def body(batcher):
+            return await asyncio.gather(*(batcher.insert({"n": n}) for n in range(7)))
+
+        assert asyncio.run(self._with_batcher(body)) == [f"job-{n}" for n in range(7)]
+        assert self.table.calls == [3, 3, 1]
+
+    def test_bad_row_does_not_fail_the_others(self):
+        rows = [{"n": 0}, {"n": 1, "bad": True}, {"n": 2}]
+
+        async def body(batcher):
+            return await asyncio.gather(*(batcher.insert(row) for row in rows), return_exceptions=True)
+
+        results = asyncio.run(self._with_batcher(body))
+        assert results[0] == "job-0" and results[2] == "job-2"
+        assert isinstance(results[1], HTTPException)
+        # One bulk attempt, then one retry per row
+        assert self.table.calls == [3, 1, 1, 1]
+
+    def test_restart_on_a_new_event_loop(self):
+        # Each app lifespan (reloader, repeated TestClient contexts) runs its own loop
+        batcher = JobInsertBatcher()
+
+        async def lifespan(n):
+            batcher.start()
+            try:
+                return await batcher.insert({"n": n})
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(lifespan(1)) == "job-1"
+        assert asyncio.run(lifespan(2)) == "job-2"
+
+    def test_stop_cancels_queued_inserts(self):
+        async def run():
+            batcher = JobInsertBatcher()
+            batcher.start()
+            # Queued before the runner gets a turn, so nothing will flush it
+            future = asyncio.get_running_loop().create_future()
+            batcher._queue.put_nowait(({"n": 1}, future))
+            await batcher.stop()
+            return future
+
+        assert asyncio.run(run()).cancelled()
+        assert self.table.calls == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,115 @@
+"""
+Tests for GET /api/jobs/status (batched job status).
+
+Auth and Supabase are replaced through FastAPI dependency overrides, so no
+network or Supabase project is needed.
+
+Run with: python -m pytest tests/test_jobs_status.py -v
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+
+USER_ID = "user-1"
+PROJECT_ID = str(uuid4())
+OTHER_PROJECT_ID = str(uuid4())
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query; filters rows in memory."""
+
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = rows
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.table.in_calls.append(list(values))
+        self.rows = [r for r in self.rows if r[column] in values]
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    async def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.in_calls = []
+
+    def table(self, name):
+        return FakeQuery(self, list(self.tables[name]))
+
+
+def job_row(project_id):
+    return {
+        "id": str(uuid4()), "project_id": project_id, "type": "ingest", "status": "completed",
+        "payload": {}, "result": None, "error_message": None,
+    }
+
+
+class TestJobsStatus:
+
+    def setup_method(self):
+        self.mine = job_row(PROJECT_ID)
+        self.theirs = job_row(OTHER_PROJECT_ID)
+        self.supabase = FakeSupabase({
+            "jobs": [self.mine, self.theirs],
+            "projects": [{"id": PROJECT_ID, "user_id": USER_ID}, {"id": OTHER_PROJECT_ID, "user_id": "user-2"}],
+        })
+        main.app.dependency_overrides[main.get_current_user] = lambda: USER_ID
+        main.app.dependency_overrides[main.get_supabase] = lambda: self.supabase
+        self.client = TestClient(main.app)
+
+    def teardown_method(self):
+        main.app.dependency_overrides.clear()
+
+    def get(self, *ids):
+        return self.client.get("/api/jobs/status", params={"ids": ",".join(ids)})
+
+    def test_owned_jobs_only(self):
+        response = self.get(self.mine["id"], self.theirs["id"], str(uuid4()))
+        assert response.status_code == 200
+        assert list(response.json()) == [self.mine["id"]]
+
+    def test_malformed_ids_dropped(self):
+        response = self.get("not-a-uuid", self.mine["id"], "123")
+        assert response.status_code == 200
+        assert list(response.json()) == [self.mine["id"]]
+        # Only canonical UUIDs reach the in.() filter
+        assert self.supabase.in_calls[0] == [self.mine["id"]]
+
+    def test_only_malformed_ids_skips_the_query(self):
+        response = self.get("nope", "also-nope")
+        assert response.json() == {}
+        assert self.supabase.in_calls == []
+
+    def test_keyed_by_id_as_sent(self):
+        sent = self.mine["id"].upper()
+        response = self.get(sent)
+        assert list(response.json()) == [sent]
+        assert self.supabase.in_calls[0] == [self.mine["id"]]
+
+    def test_batch_limit(self):
+        response = self.get(*(str(uuid4()) for _ in range(main.MAX_STATUS_BATCH + 1)))
+        assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
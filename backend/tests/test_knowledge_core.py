@@ -0,0 +1,140 @@
+"""
+Tests for KnowledgeCoreService helpers (cache keys, chunking, merging).
+
+Run with: python -m pytest tests/test_knowledge_core.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core.knowledge_core import (
+    KnowledgeCoreService, _normalize_for_cache, _split_text, _dedupe, _merge_cores,
+)
+from backend.core.knowledge_models import (
+    KnowledgeCore, Concept, Definition, Example, KeyFact, NoteContent, Section,
+)
+
+
+def cache_key(text):
+    return KnowledgeCoreService._cache_key("prompt", "model", text)
+
+
+def make_core(title, concepts=(), definitions=(), facts=(), summary="", section=None, note=None, example=None):
+    return KnowledgeCore(
+        title=title,
+        summary=summary,
+        concepts=[Concept(name=n, description=f"{n} ({title})", importance_score=s) for n, s in concepts],
+        section_hierarchy=[Section(title=section, summary=title)] if section else [],
+        notes=[NoteContent(heading=note, bullets=[note])] if note else [],
+        definitions=[Definition(term=t, definition=f"{t} ({title})", context=title) for t in definitions],
+        examples=[Example(description=example, relevance=title)] if example else [],
+        key_facts=[KeyFact(fact=f, category="Technical") for f in facts],
+    )
+
+
+class TestCacheNormalization:
+    """Cache keys ignore layout, never content."""
+
+    def test_whitespace_layout_ignored(self):
+        assert cache_key("Cell  division\n\noccurs\tin phases. ") == cache_key("Cell division occurs in phases.")
+
+    def test_unicode_composition_ignored(self):
+        # "é" precomposed vs "e" + combining acute
+        assert _normalize_for_cache("caf\u00e9") == _normalize_for_cache("cafe\u0301")
+
+    @pytest.mark.parametrize("a, b", [
+        ("Learn C++ today", "Learn C today"),
+        ("pi is 3.14", "pi is 314"),
+        ("x-y plane", "x y plane"),
+        ("Polish history", "polish history"),
+    ])
+    def test_content_differences_kept(self, a, b):
+        assert cache_key(a) != cache_key(b)
+
+
+class TestSplitText:
+
+    def test_short_text_single_chunk(self):
+        assert _split_text("  Short lecture.  ", 100) == ["Short lecture."]
+
+    def test_empty_text_no_chunks(self):
+        assert _split_text("   ", 100) == []
+
+    def test_prefers_paragraph_break(self):
+        text = "First paragraph. It has sentences.\n\nSecond paragraph here."
+        assert _split_text(text, 40) == ["First paragraph. It has sentences.", "Second paragraph here."]
+
+    def test_falls_back_to_sentence_then_word(self):
+        assert _split_text("One two three. Four five six seven", 20) == ["One two three.", "Four five six seven"]
+        assert _split_text("alpha beta gamma delta epsilon", 12) == ["alpha beta", "gamma delta", "epsilon"]
+
+    def test_hard_cut_without_boundaries(self):
+        assert _split_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_chunks_bounded_and_lossless(self):
+        text = " ".join(f"Sentence number {i} ends here." for i in range(200))
+        chunks = _split_text(text, 500)
+        assert len(chunks) > 1
+        assert all(len(c) <= 500 for c in chunks)
+        assert " ".join(chunks).split() == text.split()
+
+
+class TestDedupe:
+
+    def test_first_occurrence_wins_in_order(self):
+        items = ["Mitosis", "ATP", "mitosis ", "Osmosis", "atp"]
+        assert _dedupe(items, key=lambda x: x) == ["Mitosis", "ATP", "Osmosis"]
+
+    def test_uses_key(self):
+        items = [("a", 1), ("b", 2), ("A", 3)]
+        assert _dedupe(items, key=lambda x: x[0]) == [("a", 1), ("b", 2)]
+
+
+class TestMergeCores:
+
+    def setup_method(self):
+        self.first = make_core(
+            "Cell Biology", concepts=[("Mitosis", 6), ("ATP", 9)], definitions=["Organelle"],
+            facts=["Cells divide."], summary="Part one.", section="Division", note="Phases", example="Zipper",
+        )
+        self.second = make_core(
+            "Ignored title", concepts=[("mitosis", 8), ("Osmosis", 4)], definitions=["organelle", "Vacuole"],
+            facts=["cells divide.", "Water moves."], summary="Part two.", section="Transport", note="Diffusion",
+        )
+
+    def test_single_core_unchanged(self):
+        assert _merge_cores([self.first]) == self.first
+
+    def test_title_from_first_summaries_joined(self):
+        merged = _merge_cores([self.first, self.second])
+        assert merged.title == "Cell Biology"
+        assert merged.summary == "Part one. Part two."
+
+    def test_concepts_deduped_keeping_highest_importance(self):
+        merged = _merge_cores([self.first, self.second])
+        assert [(c.name, c.importance_score) for c in merged.concepts] == [("Mitosis", 8), ("ATP", 9), ("Osmosis", 4)]
+        # The first chunk's wording is kept
+        assert merged.concepts[0].description == "Mitosis (Cell Biology)"
+
+    def test_definitions_and_facts_deduped(self):
+        merged = _merge_cores([self.first, self.second])
+        assert [d.term for d in merged.definitions] == ["Organelle", "Vacuole"]
+        assert [f.fact for f in merged.key_facts] == ["Cells divide.", "Water moves."]
+
+    def test_outline_notes_examples_concatenated_in_order(self):
+        merged = _merge_cores([self.first, self.second])
+        assert [s.title for s in merged.section_hierarchy] == ["Division", "Transport"]
+        assert [n.heading for n in merged.notes] == ["Phases", "Diffusion"]
+        assert [e.description for e in merged.examples] == ["Zipper"]
+
+    def test_inputs_not_modified(self):
+        _merge_cores([self.first, self.second])
+        assert self.first.concepts[0].importance_score == 6
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
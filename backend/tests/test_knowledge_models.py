@@ -0,0 +1,56 @@
+"""
+Tests for the Knowledge Core models.
+
+Run with: python -m pytest tests/test_knowledge_models.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pydantic import ValidationError
+
+from backend.core.knowledge_models import Concept
+
+
+def make_concept(score):
+    return Concept(name="Entropy", description="Disorder of a system", importance_score=score)
+
+
+class TestImportanceClamp:
+    """importance_score is pulled into 1-10 before validation."""
+
+    @pytest.mark.parametrize("score", [1, 5, 10])
+    def test_in_range_int_unchanged(self, score):
+        assert make_concept(score).importance_score == score
+
+    @pytest.mark.parametrize("score, expected", [(0, 1), (-3, 1), (11, 10), (100, 10)])
+    def test_out_of_range_int_clamped(self, score, expected):
+        assert make_concept(score).importance_score == expected
+
+    @pytest.mark.parametrize("score, expected", [(7.0, 7), (7.6, 8), (0.2, 1), (11.5, 10), (-2.0, 1)])
+    def test_float_clamped_and_rounded(self, score, expected):
+        concept = make_concept(score)
+        assert concept.importance_score == expected
+        assert type(concept.importance_score) is int
+
+    def test_bool_not_treated_as_number(self):
+        """False must not be clamped up to 1."""
+        with pytest.raises(ValidationError):
+            make_concept(False)
+
+    @pytest.mark.parametrize("score", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_rejected(self, score):
+        with pytest.raises(ValidationError):
+            make_concept(score)
+
+    def test_non_numeric_rejected(self):
+        with pytest.raises(ValidationError):
+            make_concept("very")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+"""
+Tests for OwnerCache (two-tier project ownership cache).
+
+Redis is replaced by an in-memory stand-in; no server is needed.
+
+Run with: python -m pytest tests/test_owner_cache.py -v
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+from uuid import uuid4
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.owner_cache import OwnerCache
+
+
+class FakeRedis:
+    """The get/set/delete subset OwnerCache uses; values are stored as bytes like redis-py returns."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Loader:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+class TestOwnerCache:
+
+    def setup_method(self):
+        self.cache = OwnerCache(url="")
+        self.redis = self.cache._redis = FakeRedis()
+
+    def lookup(self, project_id, loader, times=1):
+        async def run():
+            return [await self.cache.get_owner(project_id, loader) for _ in range(times)]
+        return asyncio.run(run())
+
+    def test_owner_cached_after_first_lookup(self):
+        loader = Loader((True, "user-1"))
+        assert self.lookup("p1", loader, times=3) == [(True, "user-1")] * 3
+        assert loader.calls == 1
+        assert self.redis.data["po:p1"] == b"user-1"
+
+    def test_missing_project_never_cached(self):
+        loader = Loader((False, None))
+        assert self.lookup("p1", loader, times=2) == [(False, None)] * 2
+        assert loader.calls == 2
+        assert "po:p1" not in self.redis.data
+
+    def test_unowned_project_cached_as_none(self):
+        loader = Loader((True, None))
+        self.lookup("p1", loader)
+        assert self.redis.data["po:p1"] == b""
+        # A fresh process reads it back from Redis as unowned
+        self.cache._local.clear()
+        assert self.lookup("p1", loader) == [(True, None)]
+        assert loader.calls == 1
+
+    def test_redis_tier_fills_local_tier(self):
+        self.redis.data["po:p1"] = b"user-2"
+        loader = Loader((True, "stale"))
+        assert self.lookup("p1", loader) == [(True, "user-2")]
+        assert self.cache._local["p1"] == "user-2"
+        assert loader.calls == 0
+
+    def test_invalidate_clears_both_tiers(self):
+        self.lookup("p1", Loader((True, "user-1")))
+
+        asyncio.run(self.cache.invalidate("p1"))
+
+        assert "p1" not in self.cache._local
+        assert "po:p1" not in self.redis.data
+        # After a delete the next lookup goes back to the database
+        gone = Loader((False, None))
+        assert self.lookup("p1", gone) == [(False, None)]
+        assert gone.calls == 1
+
+    def test_invalidate_accepts_non_str_ids(self):
+        self.lookup("42", Loader((True, "user-1")))
+        asyncio.run(self.cache.invalidate(42))
+        assert "42" not in self.cache._local
+
+    def test_casings_share_one_entry(self):
+        project_id = str(uuid4())
+        loader = Loader((True, "user-1"))
+        self.lookup(project_id.upper(), loader)
+        assert self.lookup(project_id, loader) == [(True, "user-1")]
+        assert loader.calls == 1
+        assert list(self.redis.data) == [f"po:{project_id}"]
+
+    def test_invalidate_clears_every_casing(self):
+        project_id = str(uuid4())
+        self.lookup(project_id.upper(), Loader((True, "user-1")))
+
+        asyncio.run(self.cache.invalidate(project_id))
+
+        assert len(self.cache._local) == 0
+        assert self.redis.data == {}
+        gone = Loader((False, None))
+        assert self.lookup(project_id.upper(), gone) == [(False, None)]
+        assert gone.calls == 1
+
+    def test_works_without_redis(self):
+        self.cache._redis = None
+        loader = Loader((True, "user-1"))
+        assert self.lookup("p1", loader, times=2) == [(True, "user-1")] * 2
+        assert loader.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
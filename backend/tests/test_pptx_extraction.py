@@ -0,0 +1,114 @@
+"""
+Tests for PPTX text extraction (zip + lxml slide parsing).
+
+Decks are built with python-pptx, which also serves as the reference for
+what each shape's text should read as.
+
+Run with: python -m pytest tests/test_pptx_extraction.py -v
+"""
+
+import pytest
+import sys
+import os
+import io
+
+from pptx import Presentation
+from pptx.util import Inches
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.core.extraction import ExtractionService
+
+
+def build_deck(path):
+    prs = Presentation()
+
+    # Slide 1: title + bulleted body with a soft line break, and speaker notes
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Photosynthesis"
+    body = slide.placeholders[1].text_frame
+    body.text = "Light reactions"
+    para = body.add_paragraph()
+    para.add_run().text = "Calvin"
+    para.add_line_break()
+    para.add_run().text = "cycle"
+    slide.notes_slide.notes_text_frame.text = "Mention chlorophyll"
+
+    # Slide 2: a table (empty cells skipped) and a grouped shape (not extracted)
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Rates"
+    table = slide.shapes.add_table(2, 3, Inches(1), Inches(2), Inches(6), Inches(1)).table
+    for c, text in enumerate(["Stage", "Input", "Output"]):
+        table.cell(0, c).text = text
+    table.cell(1, 0).text = "Light"
+    table.cell(1, 2).text = "ATP"
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(Inches(1), Inches(4), Inches(2), Inches(1)).text_frame.text = "grouped"
+
+    # Slide 3: nothing but an empty title, so it produces no section
+    prs.slides.add_slide(prs.slide_layouts[5])
+
+    prs.save(path)
+    return prs
+
+
+class TestExtractPptx:
+
+    def setup_method(self):
+        self.service = ExtractionService()
+
+    def test_slide_text_tables_and_notes(self, tmp_path):
+        path = str(tmp_path / "deck.pptx")
+        build_deck(path)
+
+        text, metadata = self.service._extract_pptx(path)
+
+        assert text == (
+            "--- Slide 1 ---\n"
+            "Photosynthesis\n"
+            "Light reactions\nCalvin\vcycle\n"
+            "[Speaker Notes: Mention chlorophyll]"
+            "\n\n"
+            "--- Slide 2 ---\n"
+            "Rates\n"
+            "Stage | Input | Output\n"
+            "Light | ATP"
+        )
+        assert "grouped" not in text
+        assert metadata == {"slide_count": 3, "source": "deck.pptx"}
+
+    def test_shape_text_matches_python_pptx(self, tmp_path):
+        path = str(tmp_path / "deck.pptx")
+        build_deck(path)
+        text, _ = self.service._extract_pptx(path)
+
+        for shape in Presentation(path).slides[0].shapes:
+            assert shape.text_frame.text.strip() in text
+
+    def test_follows_presentation_order(self, tmp_path):
+        path = str(tmp_path / "deck.pptx")
+        prs = build_deck(path)
+        # Move slide 2 to the front without renaming the slide parts
+        id_list = prs.slides._sldIdLst
+        id_list.insert(0, id_list[1])
+        prs.save(path)
+
+        text, _ = self.service._extract_pptx(path)
+        assert text.startswith("--- Slide 1 ---\nRates\n")
+        assert "--- Slide 2 ---\nPhotosynthesis\n" in text
+
+    def test_reads_from_memory(self, tmp_path):
+        path = str(tmp_path / "deck.pptx")
+        build_deck(path)
+        with open(path, "rb") as f:
+            source = io.BytesIO(f.read())
+
+        assert self.service._extract_pptx("upload.pptx", source) == (
+            self.service._extract_pptx(path)[0],
+            {"slide_count": 3, "source": "upload.pptx"},
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+"""
+Tests for bearer-token resolution caching in main.py.
+
+_fetch_user_id (the Supabase Auth call) is replaced by a fake, so no
+network or Supabase project is needed.
+
+Run with: python -m pytest tests/test_token_cache.py -v
+"""
+
+import pytest
+import sys
+import os
+import time
+import asyncio
+
+import jwt
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+
+
+class FakeAuth:
+    """Stands in for _fetch_user_id; counts calls and can be made to fail."""
+
+    def __init__(self, user_id="user-1", delay=0.01, error=None):
+        self.user_id = user_id
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, token):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.user_id
+
+
+class TestResolveUserId:
+
+    @pytest.fixture(autouse=True)
+    def fake_auth(self, monkeypatch):
+        main._token_cache.clear()
+        main._token_inflight.clear()
+        self.auth = FakeAuth()
+        monkeypatch.setattr(main, "_fetch_user_id", self.auth)
+        yield
+        main._token_cache.clear()
+
+    def test_cached_after_first_lookup(self):
+        async def run():
+            return [await main._resolve_user_id("tok") for _ in range(3)]
+
+        assert asyncio.run(run()) == ["user-1"] * 3
+        assert self.auth.calls == 1
+
+    def test_concurrent_lookups_share_one_call(self):
+        async def run():
+            return await asyncio.gather(*(main._resolve_user_id("tok") for _ in range(20)))
+
+        assert asyncio.run(run()) == ["user-1"] * 20
+        assert self.auth.calls == 1
+        assert not main._token_inflight
+
+    def test_tokens_cached_separately(self):
+        async def run():
+            await main._resolve_user_id("tok-a")
+            await main._resolve_user_id("tok-b")
+
+        asyncio.run(run())
+        assert self.auth.calls == 2
+
+    def test_raw_token_not_kept(self):
+        asyncio.run(main._resolve_user_id("secret-token"))
+        assert all(isinstance(k, bytes) and b"secret-token" not in k for k in main._token_cache.keys())
+
+    def test_failure_reaches_every_waiter_and_is_not_cached(self):
+        self.auth.error = HTTPException(status_code=401, detail="Invalid or expired token")
+
+        async def run():
+            return await asyncio.gather(*(main._resolve_user_id("bad") for _ in range(5)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, HTTPException) and r.status_code == 401 for r in results)
+        assert self.auth.calls == 1
+        assert not main._token_inflight
+
+        # A later attempt asks Supabase again
+        self.auth.error = None
+        assert asyncio.run(main._resolve_user_id("bad")) == "user-1"
+        assert self.auth.calls == 2
+
+    def test_cancelled_leader_does_not_fail_followers(self):
+        self.auth.delay = 0.05
+
+        async def run():
+            leader = asyncio.ensure_future(main._resolve_user_id("tok"))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(main._resolve_user_id("tok"))
+            await asyncio.sleep(0)
+            # The leader's client disconnects mid-lookup
+            leader.cancel()
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+
+        leader_result, follower_result = asyncio.run(run())
+        assert isinstance(leader_result, asyncio.CancelledError)
+        assert follower_result == "user-1"
+        assert self.auth.calls == 1
+        # The lookup still completed and was cached
+        assert asyncio.run(main._resolve_user_id("tok")) == "user-1"
+        assert self.auth.calls == 1
+
+
+class TestTokenExpiry:
+
+    def test_expiry_read_from_jwt(self):
+        exp = int(time.time()) + 600
+        token = jwt.encode({"sub": "user-1", "exp": exp}, "k" * 32, algorithm="HS256")
+        assert main._token_expiry(token) == exp
+
+    def test_unparseable_token_gets_default_ttl(self):
+        before = time.time()
+        assert before + main.TOKEN_CACHE_TTL <= main._token_expiry("not-a-jwt") <= time.time() + main.TOKEN_CACHE_TTL
+
+    def test_ttl_capped_at_token_cache_ttl(self):
+        now = 1000.0
+        assert main._token_ttu(None, ("user-1", time.time() + 3600), now) == now + main.TOKEN_CACHE_TTL
+
+    def test_entry_never_outlives_token(self):
+        now = 1000.0
+        expiry = main._token_ttu(None, ("user-1", time.time() + 5), now)
+        assert now + 4 < expiry <= now + 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,65 @@
+"""
+Tests for _store_upload (content-addressed upload storage) in main.py.
+
+Run with: python -m pytest tests/test_upload_store.py -v
+"""
+
+import pytest
+import sys
+import os
+import io
+import hashlib
+
+from fastapi import HTTPException
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import main
+
+
+def stored_files(root):
+    return [os.path.join(d, f) for d, _, files in os.walk(root) for f in files]
+
+
+class TestStoreUpload:
+
+    @pytest.fixture(autouse=True)
+    def store(self, tmp_path, monkeypatch):
+        self.root = str(tmp_path / "uploads")
+        monkeypatch.setattr(main, "UPLOAD_STORE_DIR", self.root)
+        monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1000)
+        # Small chunks so the size check runs mid-stream
+        monkeypatch.setattr(main, "UPLOAD_CHUNK_SIZE", 64)
+
+    def test_stored_under_content_hash(self):
+        data = b"lecture notes " * 50
+        path, content_hash = main._store_upload(io.BytesIO(data), ".md")
+
+        assert content_hash == hashlib.blake2b(data, digest_size=32).hexdigest()
+        assert path == os.path.join(self.root, content_hash[:2], f"{content_hash}.md")
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert stored_files(self.root) == [path]
+
+    def test_identical_uploads_share_a_path(self):
+        first, _ = main._store_upload(io.BytesIO(b"same bytes"), ".pdf")
+        second, _ = main._store_upload(io.BytesIO(b"same bytes"), ".pdf")
+        assert first == second
+        assert stored_files(self.root) == [first]
+
+    def test_upload_at_limit_accepted(self):
+        path, _ = main._store_upload(io.BytesIO(b"x" * 1000), ".txt")
+        assert os.path.getsize(path) == 1000
+
+    def test_oversized_upload_rejected_with_413(self):
+        with pytest.raises(HTTPException) as exc:
+            main._store_upload(io.BytesIO(b"x" * 1001), ".txt")
+
+        assert exc.value.status_code == 413
+        # The partial temp file is removed
+        assert stored_files(self.root) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
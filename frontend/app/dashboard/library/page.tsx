@@ -174,7 +174,7 @@ export default function LibraryPage() {
                   <h3 className="text-xl font-display font-bold uppercase tracking-tight truncate">{project.name}</h3>
                   <div className="flex items-center gap-4">
                     <span className="px-3 py-1 bg-honey-50 text-honey-700 rounded-full text-[8px] font-bold uppercase tracking-widest">
-                      {project.canvas_state?.nodes?.length || 0} Agents
+                      {project.node_count ?? project.canvas_state?.nodes?.length ?? 0} Agents
                     </span>
 
                     <span className="text-[10px] font-bold opacity-30 uppercase tracking-tighter">
@@ -13,6 +13,7 @@ export interface Project {
     nodes: any[];
     edges: any[];
   };
+  node_count?: number; // Returned by list() in place of canvas_state
 
   created_at: string;
   updated_at: string;